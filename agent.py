@@ -7,18 +7,25 @@ This file only handles startup and shutdown.
 """
 
 from livekit import agents
-from livekit.agents import AgentSession, RoomInputOptions
+from livekit.agents import AgentSession, MetricsCollectedEvent, RoomInputOptions, metrics
 from livekit.plugins import  bithuman
 from core.session_state import UserData
 from agents.main_agent import ConversationAgent
+from agents.base import create_realtime_model, cancel_spawned
 from utils.history import save_conversation_to_file, normalize_messages
-from utils.webhook import send_session_webhook
+from utils.webhook import new_session_id, send_session_webhook, close_webhook_client
+from utils.search_pipeline import close_search_clients
+import asyncio
+import atexit
 import logging
+import logging.handlers
 import os
-import re
+import queue
+import weakref
 from datetime import datetime
-from config.settings import LOGS_DIR
+from config.settings import LOGS_DIR, LLM_TEMPERATURE_WORKFLOW, USE_UVLOOP, EAGER_TASKS
 from utils.translate_online import translate_transcribed_text
+from utils.regex_registry import EMAIL_SCAN
 
 # ══════════════════════════════════════════════════════════════════════════════
 # LOGGING
@@ -29,44 +36,109 @@ if not os.path.exists(LOGS_DIR):
 
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 log_file = os.path.join(LOGS_DIR, f"app_{timestamp}.log")
+# Log records go through a queue; file/console writes happen on the listener
+# thread so logging never blocks the event loop on disk I/O.
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.FileHandler(log_file),
+    logging.StreamHandler(),
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler(),
-    ],
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
 )
 logger = logging.getLogger(__name__)
 
 for noisy in ["httpx", "httpcore", "openai", "livekit.agents", "urllib3", "asyncio", "livekit"]:
     logging.getLogger(noisy).setLevel(logging.WARNING)
 
+# Module level, so job processes (which re-import this module) get it too.
+# The LiveKit worker creates the job loops itself, so this sets the loop policy
+# those loops come from — uvloop.install() is deprecated on Python 3.12+.
+if USE_UVLOOP:
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:  # optional dependency
+        logger.warning("USE_UVLOOP is set but uvloop is not installed — using asyncio's default loop")
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # TRANSCRIPT EMAIL EXTRACTION (safety net for sudden session close)
 # ══════════════════════════════════════════════════════════════════════════════
 
-_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
-
-
-def _extract_contact_from_transcript(chat_messages, userdata) -> None:
+def _extract_contact_from_transcript(transcript, userdata) -> None:
     """Extract email from transcript if not already stored in userdata.
 
     Safety net for sudden session close — the visitor may have said their
     email but the LLM hadn't yet called the contact collection tool.
+
+    Args:
+        transcript: Normalized {role, message} dicts (see normalize_messages).
     """
     if userdata.email:
         return
 
-    for msg in normalize_messages(chat_messages):
-        if msg["role"] != "user":
-            continue
-        match = _EMAIL_RE.search(msg["message"])
-        if match:
-            userdata.email = match.group(0).lower()
-            logger.info(f"Extracted email from transcript on shutdown: {userdata.email}")
-            break
+    # One regex scan over all user text instead of one search per message
+    user_text = "\n".join(
+        msg["message"] for msg in transcript if msg["role"] == "user"
+    )
+    match = EMAIL_SCAN.search(user_text)
+    if match:
+        userdata.email = match.group(0).lower()
+        logger.info(f"Extracted email from transcript on shutdown: {userdata.email}")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FRONTEND DATA DISPATCH (one room listener per session, not per agent)
+# ══════════════════════════════════════════════════════════════════════════════
+
+_DATA_TOPICS = frozenset({"language", "trigger"})
+
+
+def _register_data_dispatch(room, session: AgentSession) -> None:
+    """Route frontend data packets to whichever agent is currently active.
+
+    Agents used to register their own room listener in __init__, so every
+    handoff added another listener that parsed each packet again. A single
+    listener here forwards to session.current_agent instead.
+    """
+    session_ref = weakref.ref(session)
+
+    @room.on("data_received")
+    def _dispatch_data(data):
+        if data.topic not in _DATA_TOPICS:
+            return
+        current_session = session_ref()
+        if current_session is None:
+            return
+        try:
+            agent = current_session.current_agent
+        except RuntimeError:
+            return  # session not running yet / already closed
+        handler = getattr(agent, "_on_data_packet", None)
+        if handler:
+            # Synchronous: agents only spawn a task for work that needs to await
+            handler(data)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PREWARM (runs once per worker process, before any job is assigned)
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def prewarm(proc: agents.JobProcess):
+    """Build the shared realtime models up front so the first session and every
+    handoff reuse them instead of constructing one per agent."""
+    try:
+        create_realtime_model()
+        create_realtime_model(temperature=LLM_TEMPERATURE_WORKFLOW)
+    except Exception as e:
+        logger.warning(f"Realtime model prewarm failed (will retry per session): {e}")
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -75,35 +147,68 @@ def _extract_contact_from_transcript(chat_messages, userdata) -> None:
 
 
 async def entrypoint(ctx: agents.JobContext):
+    if EAGER_TASKS and hasattr(asyncio, "eager_task_factory"):
+        # Tasks that finish without suspending (cache hits, buffered sends) skip the ready queue
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
     userData = UserData()
     session = AgentSession[UserData](userdata=userData)
     start_time = datetime.now()
 
+    # Token usage per session — llm_prompt_cached_tokens shows how much of the
+    # (static-first) prompt the realtime API served from its prefix cache
+    usage = metrics.UsageCollector()
+
+    @session.on("metrics_collected")
+    def _on_metrics(ev: MetricsCollectedEvent):
+        usage.collect(ev.metrics)
+
     async def on_shutdown():
+        logger.info(f"Session usage: {usage.get_summary()}")
         try:
             ud = session.userdata
+            # Button/language handlers and pending frontend sends are moot once
+            # the room is gone — cancel them and let them unwind first.
+            if ud:
+                await cancel_spawned(ud)
+            # Don't drop lead emails or history saves still running in the background.
+            # The set is shared by every conversation of this session (restarts
+            # included), and must be empty before the finally below closes the
+            # webhook/search clients those tasks use.
+            while ud and ud._background_tasks:
+                await asyncio.gather(*ud._background_tasks, return_exceptions=True)
             if ud and not ud._history_saved:
-                # Get complete conversation across all agents
-                chat_history = list(session.history.items)
+                # Normalize the complete conversation once; every consumer below
+                # reuses it (normalize_messages returns its own result as-is)
+                chat_history = normalize_messages(session.history.items)
 
                 # Safety net: extract email from transcript if not yet stored
                 _extract_contact_from_transcript(chat_history, ud)
 
-                # Save local history file
-                save_conversation_to_file(chat_history, ud, start_time)
-
-                # Send webhook (async, non-blocking)
-                session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                await send_session_webhook(session_id, chat_history, ud, start_time)
+                # Save local history file (worker thread) and send webhook concurrently
+                session_id = new_session_id()
+                save_result, webhook_result = await asyncio.gather(
+                    asyncio.to_thread(save_conversation_to_file, chat_history, ud, start_time),
+                    send_session_webhook(session_id, chat_history, ud, start_time),
+                    return_exceptions=True,
+                )
+                if isinstance(save_result, Exception):
+                    logger.error(f"Failed to save conversation file on shutdown: {save_result}")
+                if isinstance(webhook_result, Exception):
+                    logger.error(f"Failed to send webhook on shutdown: {webhook_result}")
 
                 ud._history_saved = True
                 logger.info("Conversation saved and webhook sent on session shutdown")
         except Exception as e:
             logger.error(f"Failed to save conversation on shutdown: {e}")
+        finally:
+            await close_webhook_client()
+            await close_search_clients()
 
     ctx.add_shutdown_callback(on_shutdown)
 
     session.on("user_input_transcribed", translate_transcribed_text)
+    _register_data_dispatch(ctx.room, session)
 
     try:
         avatar = bithuman.AvatarSession(
@@ -135,5 +240,5 @@ async def entrypoint(ctx: agents.JobContext):
 
 if __name__ == "__main__":
     agents.cli.run_app(
-        agents.WorkerOptions(entrypoint_fnc=entrypoint),
+        agents.WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm),
     )
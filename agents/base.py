@@ -5,19 +5,30 @@ Configures the LLM, injects base prompt, and streams text to frontend.
 Used by: all agent subclasses in agents/
 """
 
-import json
 import asyncio
+import contextlib
+import functools
+import random
 import time
 import logging
 from typing import AsyncIterable
+from utils import fastjson
 from livekit.agents import Agent, ModelSettings, function_tool
 from livekit.rtc import DataPacket
 from livekit.plugins import openai
 from core.session_state import UserData, RunContext_T
-from config.settings import RT_MODEL, LLM_TEMPERATURE
+from config.settings import (
+    RT_MODEL,
+    LLM_TEMPERATURE,
+    TRANSCRIPT_DELTA_CHARS,
+    TRANSCRIPT_DELTA_INTERVAL,
+    TRANSCRIPT_STREAM_DELTAS,
+)
 from config.messages import AGENT_MESSAGES
-from config.language import get_language_instruction, get_language_prefix, handle_language_update, language_manager, lang_hint
+from config.language import get_language_block, handle_language_update, language_manager, lang_hint
 from config.translations import UI_BUTTONS_TRANSLATIONS
+from utils.history import normalize_messages, save_conversation_to_file
+from utils.webhook import new_session_id, send_session_webhook
 import prompt.static_workflow as prompts
 
 logger = logging.getLogger(__name__)
@@ -26,11 +37,226 @@ REPLY_MAX_RETRIES = 3
 REPLY_BACKOFF = 1.0
 
 # Collect all "new conversation" button keys across all languages for matching
-_NEW_CONV_KEYS = set()
-for _lang_buttons in UI_BUTTONS_TRANSLATIONS.values():
-    _NEW_CONV_KEYS.update(k.lower() for k in _lang_buttons.get("new_conversation", {}))
+_NEW_CONV_KEYS = frozenset(
+    k.lower()
+    for _lang_buttons in UI_BUTTONS_TRANSLATIONS.values()
+    for k in _lang_buttons.get("new_conversation", {})
+)
+
+
+def is_new_conversation(parsed) -> bool:
+    """True if a trigger payload is a "new conversation" button (any language).
+
+    JSON object keys are always str, so no str() per key; any() stops at the
+    first match.
+    """
+    if isinstance(parsed, dict):
+        return any(key.lower() in _NEW_CONV_KEYS for key in parsed)
+    return isinstance(parsed, str) and parsed.lower() in _NEW_CONV_KEYS
+
+# Frontend data topics BaseAgent reacts to; other packets are ignored before parsing
+_HANDLED_TOPICS = frozenset({"language", "trigger"})
+
 MODEL_MAX_RETRIES = 3
 MODEL_BACKOFF = 2.0
+# Attempts when called inside the running loop, where retries can't sleep
+MODEL_MAX_RETRIES_IN_LOOP = 2
+
+# Agent classes by role, filled in as each module is imported (agents/__init__.py
+# imports them all). Handoffs between the conversation and completion agents
+# look each other up here instead of importing each other, which is circular.
+AGENT_REGISTRY: dict[str, type[Agent]] = {}
+
+# BaseAgentPrompt only varies by user_info — split once so each handoff just
+# joins the pieces instead of re-running str.format over the whole template.
+# The trailing "UserInfo: " label is split off too, so the static body can lead
+# the prompt and the per-session user info moves after the agent instructions.
+_BASE_PROMPT_HEAD, _BASE_PROMPT_TAIL = prompts.BaseAgentPrompt.split("{user_info}", 1)
+_BASE_PROMPT_STATIC, _USER_INFO_LABEL = _BASE_PROMPT_HEAD.rsplit("\n", 1)
+
+
+# Background work (frontend sends, button/language handling) runs in tracked
+# tasks: strong refs until done, failures logged right away instead of at GC,
+# and a cap on how many run at once so a bursty frontend can't pile them up.
+# Tasks and slots live on the session's UserData, so one busy room can't use up
+# another room's slots in the same worker process.
+
+
+async def _bounded(slots: asyncio.Semaphore, coro) -> None:
+    async with slots:
+        await coro
+
+
+def _on_task_done(userdata: UserData, coro, task: asyncio.Task) -> None:
+    userdata._spawned.pop(task, None)
+    # Cancelled before it ran (or while waiting for a slot): close the inner
+    # coroutine so it isn't reported as "never awaited". No-op once it finished.
+    coro.close()
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed: {task.exception()}")
+
+
+def spawn(userdata: UserData, coro, name: str, slots: str | None = "task") -> asyncio.Task:
+    """Run coro in a background task tracked on the session's userdata.
+
+    slots picks the session semaphore that bounds it: "task" (button/language
+    handling) or "send" (frontend send_text). None runs it unbounded, for
+    long-lived tasks that must not hold a slot.
+    """
+    if slots is not None:
+        coro_or_bounded = _bounded(getattr(userdata, f"_{slots}_slots"), coro)
+    else:
+        coro_or_bounded = coro
+    task = asyncio.create_task(coro_or_bounded, name=name)
+    userdata._spawned[task] = slots
+    task.add_done_callback(functools.partial(_on_task_done, userdata, coro))
+    return task
+
+
+async def cancel_spawned(userdata: UserData, keep: tuple = ()) -> None:
+    """Cancel the session's spawned tasks and wait until they have finished.
+
+    Tasks whose slot kind is in `keep` are left running and not waited for
+    (handoffs let frontend sends drain). The calling task is never cancelled.
+    """
+    current = asyncio.current_task()
+    cancelled = [
+        task for task, slots in list(userdata._spawned.items())
+        if task is not current and slots not in keep
+    ]
+    for task in cancelled:
+        task.cancel()
+    if cancelled:
+        await asyncio.gather(*cancelled, return_exceptions=True)
+
+
+def track_task(userdata: UserData, task: asyncio.Task) -> None:
+    """Keep a reference to a background task until it finishes.
+
+    userdata._background_tasks is session-scoped (shared across conversation
+    restarts), and on_shutdown in agent.py awaits it before closing clients.
+    """
+    userdata._background_tasks.add(task)
+    task.add_done_callback(userdata._background_tasks.discard)
+
+
+async def _persist_conversation(session_id: str, chat_history, userdata: UserData, after) -> None:
+    """Save a finished conversation to file and send its webhook, concurrently."""
+    # Appointment emails / earlier saves may still be in flight. Only tasks that
+    # existed before this one are awaited, so two quick restarts can't wait on
+    # each other.
+    if after:
+        await asyncio.gather(*after, return_exceptions=True)
+
+    save_result, webhook_result = await asyncio.gather(
+        asyncio.to_thread(save_conversation_to_file, chat_history, userdata),
+        send_session_webhook(session_id, chat_history, userdata),
+        return_exceptions=True,
+    )
+    if isinstance(save_result, Exception):
+        logger.error(f"Failed to save conversation file: {save_result}")
+    if isinstance(webhook_result, Exception):
+        logger.error(f"Failed to send webhook: {webhook_result}")
+    userdata._history_saved = True
+
+
+def persist_conversation_bg(history_items, userdata: UserData) -> None:
+    """Save history + send the webhook for a conversation being restarted,
+    without holding up the handoff. Shared by both start_new_conversation tools."""
+    try:
+        # Normalize once; the file writer and webhook reuse the result as-is
+        chat_history = normalize_messages(history_items)
+        after = tuple(userdata._background_tasks)
+        track_task(
+            userdata,
+            asyncio.create_task(_persist_conversation(new_session_id(), chat_history, userdata, after)),
+        )
+    except Exception as e:
+        logger.error(f"Failed to save conversation: {e}")
+
+
+def send_text_bg(userdata: UserData, room, text: str, topic: str) -> asyncio.Task:
+    """Schedule a send_text without awaiting it, so a tool can return (and the
+    LLM start generating) while the data-channel write is in flight."""
+    return spawn(
+        userdata,
+        room.local_participant.send_text(text, topic=topic),
+        name=f"send_text:{topic}",
+        slots="send",
+    )
+
+
+_DONE_JSON = fastjson.dumps({"done": True})
+
+
+async def _send_in_order(room, queue: asyncio.Queue) -> None:
+    """Drain (text, topic) pairs from queue one send at a time until None."""
+    while (item := await queue.get()) is not None:
+        try:
+            await room.local_participant.send_text(item[0], topic=item[1])
+        except Exception as e:
+            logger.error(f"Failed to send transcript on {item[1]}: {e}")
+
+
+async def relay_transcript(userdata: UserData, room, text: AsyncIterable[str]) -> AsyncIterable[str]:
+    """Pass transcript deltas through while mirroring them to the frontend.
+
+    The complete reply goes out on "message" once generation ends. Chunks are
+    buffered in a list and joined once, not grown with +=.
+
+    With TRANSCRIPT_STREAM_DELTAS on, new text also goes out on "message_delta"
+    every TRANSCRIPT_DELTA_CHARS or TRANSCRIPT_DELTA_INTERVAL seconds, whichever
+    comes first, and {"done": true} on "message_delta" closes every reply —
+    including an interrupted one, which never gets its "message" (callers wrap
+    this generator in contextlib.aclosing so that happens on close). Those packets
+    go through a single ordered sender task fed by a queue; it does not take a
+    send slot, so a long reply can't starve button/trigger sends.
+    """
+    parts: list[str] = []
+    if not TRANSCRIPT_STREAM_DELTAS:
+        async for delta in text:
+            parts.append(delta)
+            yield delta
+        send_text_bg(userdata, room, fastjson.dumps({"agent_response": "".join(parts)}), "message")
+        return
+
+    flushed = 0  # parts[:flushed] already sent as deltas
+    pending = 0  # chars buffered since the last delta
+    last_flush = time.monotonic()
+    outbox: asyncio.Queue = asyncio.Queue()
+    spawn(userdata, _send_in_order(room, outbox), name="send_text:transcript", slots=None)
+    try:
+        async for delta in text:
+            parts.append(delta)
+            yield delta
+            pending += len(delta)
+            now = time.monotonic()
+            if pending >= TRANSCRIPT_DELTA_CHARS or now - last_flush >= TRANSCRIPT_DELTA_INTERVAL:
+                outbox.put_nowait((fastjson.dumps({"delta": "".join(parts[flushed:])}), "message_delta"))
+                flushed, pending, last_flush = len(parts), 0, now
+
+        if flushed < len(parts):
+            outbox.put_nowait((fastjson.dumps({"delta": "".join(parts[flushed:])}), "message_delta"))
+        outbox.put_nowait((fastjson.dumps({"agent_response": "".join(parts)}), "message"))
+    finally:
+        # Also on interruption: end the stream for the frontend, then the sender
+        outbox.put_nowait((_DONE_JSON, "message_delta"))
+        outbox.put_nowait(None)
+
+
+def running_activity(agent: Agent):
+    """The agent's live AgentActivity, or None before start / after handoff.
+
+    Read fresh on each call — the activity is swapped over the agent's
+    lifetime, so it must not be cached. A plain getattr with a default
+    replaces the hasattr() probe + second attribute lookup.
+    """
+    return getattr(agent, "_activity", None)
+
+
+def _backoff_delay(base: float, attempt: int) -> float:
+    """Linear backoff with jitter (0.5x–1.5x) so concurrent retries don't line up."""
+    return base * (attempt + 1) * (0.5 + random.random())
 
 
 async def safe_generate_reply(session, room, instructions: str, retries: int = REPLY_MAX_RETRIES) -> bool:
@@ -46,13 +272,13 @@ async def safe_generate_reply(session, room, instructions: str, retries: int = R
         except Exception as e:
             logger.warning(f"generate_reply attempt {attempt + 1}/{retries} failed: {e}")
             if attempt < retries - 1:
-                await asyncio.sleep(REPLY_BACKOFF * (attempt + 1))
+                await asyncio.sleep(_backoff_delay(REPLY_BACKOFF, attempt))
 
     # All retries exhausted — send text fallback so user sees something
     logger.error(f"generate_reply failed after {retries} attempts")
     try:
         await room.local_participant.send_text(
-            json.dumps({"agent_response": AGENT_MESSAGES["patience_fallback"]}),
+            fastjson.dumps({"agent_response": AGENT_MESSAGES["patience_fallback"]}),
             topic="message",
         )
     except Exception:
@@ -60,18 +286,47 @@ async def safe_generate_reply(session, room, instructions: str, retries: int = R
     return False
 
 
+# RealtimeModel is only a factory — every agent activity opens its own realtime
+# session from it — so one instance per (model, temperature) is shared by all
+# agents in the worker process instead of being rebuilt on every handoff.
+_REALTIME_MODELS: dict[tuple, openai.realtime.RealtimeModel] = {}
+
+
 def create_realtime_model(model=None, retries: int = MODEL_MAX_RETRIES, temperature=None):
-    """Create OpenAI RealtimeModel with retry. Re-raises on total failure."""
+    """Return the shared OpenAI RealtimeModel for (model, temperature), creating
+    it with retry on first use. Re-raises on total failure.
+
+    Agents are constructed synchronously, often from inside the running event
+    loop during a handoff. In that case retries happen without sleeping —
+    time.sleep would freeze every other coroutine on the loop (transcription,
+    data packets), and the callers can't await. The constructor does no network
+    I/O, so a failure there is unlikely to be transient: in the loop, attempts
+    are capped at MODEL_MAX_RETRIES_IN_LOOP with no delay. The jittered backoff
+    only applies outside the loop.
+    """
+    key = (model or RT_MODEL, temperature if temperature is not None else LLM_TEMPERATURE)
+    cached = _REALTIME_MODELS.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        asyncio.get_running_loop()
+        in_event_loop = True
+    except RuntimeError:
+        in_event_loop = False
+    if in_event_loop:
+        retries = min(retries, MODEL_MAX_RETRIES_IN_LOOP)
+
     for attempt in range(retries):
         try:
-            return openai.realtime.RealtimeModel(
-                model=model or RT_MODEL,
-                temperature=temperature if temperature is not None else LLM_TEMPERATURE,
-            )
+            rt_model = openai.realtime.RealtimeModel(model=key[0], temperature=key[1])
+            _REALTIME_MODELS[key] = rt_model
+            return rt_model
         except Exception as e:
             logger.warning(f"RealtimeModel init attempt {attempt + 1}/{retries} failed: {e}")
             if attempt < retries - 1:
-                time.sleep(MODEL_BACKOFF * (attempt + 1))
+                if not in_event_loop:
+                    time.sleep(_backoff_delay(MODEL_BACKOFF, attempt))
             else:
                 logger.critical(f"RealtimeModel init failed after {retries} attempts")
                 raise
@@ -95,15 +350,9 @@ class BaseAgent(Agent):
         self._add_instruction = add_instruction
         self._original_instructions = instructions  # Store for language updates
         self._lang_listener_active = True
+        self._lang_version = language_manager.version
 
-        # Set up data listener for language updates
-        self._setup_data_listener()
-
-        if add_instruction:
-            instructions = prompts.BaseAgentPrompt.format(user_info=str(self.userdata)) + "\n" + instructions
-
-        # Add language prefix and suffix for maximum emphasis
-        instructions = get_language_prefix() + instructions + get_language_instruction()
+        instructions = self._compose_instructions()
 
         llm_model = create_realtime_model(model, temperature=temperature)
 
@@ -114,70 +363,108 @@ class BaseAgent(Agent):
         )
         logger.info("BaseAgent initialized successfully")
 
-    def _setup_data_listener(self) -> None:
-        """Set up listener for incoming data from frontend (e.g., language changes)."""
-        @self.room.on("data_received")
-        def on_data_received(data: DataPacket):
-            asyncio.create_task(self._handle_data_received(data))
+    def _compose_instructions(self) -> str:
+        """Build the full prompt, most-static first: base prompt, agent
+        instructions, user info, language block — joined in one pass.
 
-    async def _handle_data_received(self, data: DataPacket) -> None:
-        """Handle incoming data packets from frontend."""
+        Keeping the session-independent text at the front gives the provider a
+        stable prefix to cache across sessions and language switches.
+        """
+        if self._add_instruction:
+            parts = (
+                _BASE_PROMPT_STATIC, "\n",
+                self._original_instructions,
+                "\n\n", _USER_INFO_LABEL, str(self.userdata), _BASE_PROMPT_TAIL,
+                get_language_block(),
+            )
+        else:
+            parts = (self._original_instructions, get_language_block())
+        return "".join(parts)
+
+    def _on_data_packet(self, data: DataPacket) -> None:
+        """Handle incoming data packets from frontend.
+
+        Called synchronously by the session-level dispatcher in agent.py for the
+        current agent only. Language updates are applied inline; a task is only
+        spawned for work that has to await (instruction refresh, button replies).
+        """
         if not self._lang_listener_active:
             return
+        # Only these topics carry JSON we act on — skip everything else undecoded
+        if data.topic not in _HANDLED_TOPICS:
+            return
         try:
-            # Decode the data payload
-            payload = data.data.decode("utf-8") if isinstance(data.data, bytes) else data.data
-            parsed = json.loads(payload)
-
-            # Check if this is a language update (topic: "language")
-            if data.topic == "language":
-                logger.info(f"Received language update: {parsed}")
-                if handle_language_update(parsed):
-                    new_lang = language_manager.get_language()
-                    logger.info(f"Language successfully changed to: {new_lang}")
-                    # Update agent instructions with new language
-                    await self._update_agent_instructions()
-                else:
-                    logger.warning(f"Failed to update language: {parsed}")
-
-            # Check if this is a button response (topic: "trigger")
-            elif data.topic == "trigger":
-                logger.info(f"Received trigger response: {parsed}")
-                keys = parsed.keys() if isinstance(parsed, dict) else [parsed]
-                for key in keys:
-                    if str(key).lower() in _NEW_CONV_KEYS:
-                        logger.info("New conversation button clicked — injecting as user input")
-                        if hasattr(self, "session") and self.session:
-                            await self.session.generate_reply(
-                                user_input="I want to start a new conversation"
-                            )
-                        return
-                # Fallback: inject button value as user input for all other buttons
-                if isinstance(parsed, dict):
-                    value = next(iter(parsed.values()), None)
-                    if value and hasattr(self, "session") and self.session:
-                        logger.info(f"Button clicked — injecting as user input: {value}")
-                        await self.session.generate_reply(user_input=str(value))
-                        return
-
-        except json.JSONDecodeError as e:
+            # Parses bytes directly — no separate UTF-8 decode step
+            parsed = fastjson.loads(data.data)
+        except fastjson.JSONDecodeError as e:
             logger.debug(f"Data received is not valid JSON: {e}")
+            return
+
+        if data.topic == "language":
+            self._apply_language(parsed)
+        else:
+            spawn(self.userdata, self._handle_trigger(parsed), name="trigger")
+
+    def _apply_language(self, parsed) -> None:
+        """Apply a frontend language update (topic: "language").
+
+        Instructions are only rebuilt when the language actually changed, so a
+        frontend re-sending the current language costs nothing beyond the parse.
+        """
+        try:
+            logger.info(f"Received language update: {parsed}")
+            old_lang = language_manager.get_language()
+            if not handle_language_update(parsed):
+                logger.warning(f"Failed to update language: {parsed}")
+                return
+            new_lang = language_manager.get_language()
+            if new_lang == old_lang:
+                logger.debug(f"Language already set to {new_lang} — skipping instruction update")
+                return
+            logger.info(f"Language successfully changed to: {new_lang}")
+            # Update agent instructions with new language
+            spawn(self.userdata, self._update_agent_instructions(), name="language_update")
+        except Exception as e:
+            logger.error(f"Error handling language update: {e}")
+
+    async def _handle_trigger(self, parsed) -> None:
+        """Handle a button response (topic: "trigger") by injecting it as user input."""
+        try:
+            logger.info(f"Received trigger response: {parsed}")
+            if is_new_conversation(parsed):
+                logger.info("New conversation button clicked — injecting as user input")
+                if hasattr(self, "session") and self.session:
+                    await self.session.generate_reply(
+                        user_input="I want to start a new conversation"
+                    )
+                return
+            # Fallback: inject button value as user input for all other buttons
+            if isinstance(parsed, dict):
+                value = next(iter(parsed.values()), None)
+                if value and hasattr(self, "session") and self.session:
+                    logger.info(f"Button clicked — injecting as user input: {value}")
+                    await self.session.generate_reply(user_input=str(value))
+
         except Exception as e:
-            logger.error(f"Error handling data received: {e}")
+            logger.error(f"Error handling trigger response: {e}")
 
     async def _update_agent_instructions(self) -> None:
         """Update the agent's instructions with current language setting."""
         try:
+            # Already built for this language — nothing to push
+            if language_manager.version == self._lang_version:
+                return
+            self._lang_version = language_manager.version
             # Capture language immediately before any await to prevent stale reads
             new_lang = language_manager.get_language()
-            instructions = self._original_instructions
-            if self._add_instruction:
-                instructions = prompts.BaseAgentPrompt.format(user_info=str(self.userdata)) + "\n" + instructions
-            new_instructions = get_language_prefix() + instructions + get_language_instruction()
+            new_instructions = self._compose_instructions()
 
-            self._instructions = new_instructions
-            if hasattr(self, '_activity') and self._activity:
-                await self._activity.update_instructions(new_instructions)
+            # Language flipped back before this ran — same text, no session update
+            if new_instructions != self._instructions:
+                self._instructions = new_instructions
+                activity = running_activity(self)
+                if activity:
+                    await activity.update_instructions(new_instructions)
 
             # Update transcription language hint (uses captured new_lang)
             if hasattr(self, "session") and self.session and self.session.llm:
@@ -199,7 +486,7 @@ class BaseAgent(Agent):
     async def _safe_reply(self, instructions: str) -> bool:
         """Convenience wrapper — calls safe_generate_reply with language injection."""
         # Inject current language instruction
-        instructions = get_language_prefix() + instructions + get_language_instruction()
+        instructions = instructions + get_language_block()
         return await safe_generate_reply(self.session, self.room, instructions)
 
     @function_tool
@@ -213,19 +500,16 @@ class BaseAgent(Agent):
         return f"Summary saved. {lang_hint()}"
 
     async def transcription_node(self, text: AsyncIterable[str], model_settings: ModelSettings) -> AsyncIterable[str]:
-        agent_response = ""
-        async for delta in text:
-            agent_response += delta
-            yield delta
+        # aclosing: on interruption the relay's finally (done marker, sender
+        # shutdown) runs now, not whenever the asyncgen finalizer gets to it
+        async with contextlib.aclosing(relay_transcript(self.userdata, self.room, text)) as relay:
+            async for delta in relay:
+                yield delta
 
-        # Send message to frontend
-        try:
-            await self.room.local_participant.send_text(
-                json.dumps({"agent_response": agent_response}),
-                topic="message",
-            )
-        except Exception as e:
-            logger.error(f"Failed to send transcription to frontend: {e}")
+    async def on_exit(self) -> None:
+        # Button/language handlers belong to this agent — stop them before the
+        # next one takes over. Frontend sends keep draining in the background.
+        await cancel_spawned(self.userdata, keep=("send", None))
 
     async def update_instructions(self, instructions: str) -> None:
         """
@@ -242,14 +526,19 @@ class BaseAgent(Agent):
                 Raises:
                     llm.RealtimeError: If updating the realtime session instructions fails.
         """
+        # Unchanged instructions — skip the realtime session update entirely
+        if instructions == self._instructions:
+            return
+
         # Preserve the current chat context before updating
         current_chat_ctx = self._chat_ctx
 
         self._instructions = instructions
 
-        if hasattr(self, '_activity') and self._activity:
-            await self._activity.update_instructions(instructions)
+        activity = running_activity(self)
+        if activity:
+            await activity.update_instructions(instructions)
 
-        # Ensure chat context is restored
-        if current_chat_ctx:
+        # Ensure chat context is restored (only if the update swapped it out)
+        if current_chat_ctx and self._chat_ctx is not current_chat_ctx:
             self._chat_ctx = current_chat_ctx
\ No newline at end of file
@@ -5,14 +5,14 @@ These collect user contact info with validation and smart skipping.
 Used by: agents/qualification_agents.py (ReachabilityAgent → GetUserNameAgent)
 """
 
-import json
 import logging
 from datetime import date
+from functools import lru_cache
 from livekit.agents import function_tool
-from agents.base import BaseAgent
+from agents.base import AGENT_REGISTRY, BaseAgent
 from core.session_state import RunContext_T
-from utils.filter_extraction import is_valid_email_syntax
-from config.messages import AGENT_MESSAGES
+from utils.helpers import normalize_email
+from config.messages import AGENT_MESSAGES, CLEAN_JSON
 from config.services import get_reachability_phone_keys, get_reachability_email_keys
 from config.settings import LLM_TEMPERATURE_WORKFLOW
 import prompt.static_workflow as prompts
@@ -26,7 +26,7 @@ class GetUserNameAgent(BaseAgent):
 
         try:
             await self.room.local_participant.send_text(
-                json.dumps({"clean": True}), topic="clean"
+                CLEAN_JSON, topic="clean"
             )
         except Exception as e:
             logger.error(f"GetUserNameAgent clean message failed: {e}")
@@ -97,8 +97,9 @@ class GetUserEmailPhoneAgent(BaseAgent):
         email (required): The email address provided by the user.
         """
         logger.info(f"Collecting email: email={email}")
-        if is_valid_email_syntax(email):
-            self.userdata.email = email.lower().strip()
+        clean_email = normalize_email(email)
+        if clean_email is not None:
+            self.userdata.email = clean_email
             return _create_schedule_agent(self)
         else:
             logger.info("Email is invalid")
@@ -112,8 +113,9 @@ class GetUserEmailPhoneAgent(BaseAgent):
         phoneNumber (required): The phone number provided by the user.
         """
         logger.info(f"Collecting both: email={email}, phoneNumber={phoneNumber}")
-        if is_valid_email_syntax(email):
-            self.userdata.email = email.lower().strip()
+        clean_email = normalize_email(email)
+        if clean_email is not None:
+            self.userdata.email = clean_email
             self.userdata.phoneNumber = phoneNumber.strip()
             return _create_schedule_agent(self)
         else:
@@ -140,15 +142,7 @@ class ScheduleCallAgent(BaseAgent):
         await self._safe_reply(AGENT_MESSAGES["confirm_schedule"])
 
         # GUARANTEED: always advance
-        from agents.email_agents import SendEmailAgent
-        return SendEmailAgent(
-            instructions=prompts.BaseAgentPrompt,
-            room=self.room,
-            chat_ctx=self.chat_ctx,
-            userdata=self.userdata,
-            add_instruction=False,
-            temperature=LLM_TEMPERATURE_WORKFLOW,
-        )
+        return AGENT_REGISTRY["completion"](room=self.room, userdata=self.userdata, chat_ctx=self.chat_ctx)
 
 
 # --- Helpers ---
@@ -165,13 +159,22 @@ def _select_contact_prompt(reachability: str) -> str:
     return prompts.GetUserEmailPrompt
 
 
-def _create_email_phone_agent(agent):
-    """Create GetUserEmailPhoneAgent with correct prompt and date context."""
-    today = date.today()
-    weekday = today.strftime("%A")
-    prompt = _select_contact_prompt(agent.userdata.reachability)
-    return GetUserEmailPhoneAgent(
-        instructions=prompt + f"\nToday is {weekday}, {today}.",
+@lru_cache(maxsize=8)
+def _dated_prompt(prompt: str, ordinal: int) -> str:
+    """Sub-agent prompt with the date line for a given day appended, e.g.
+    '... Today is Monday, 2026-02-16.' Built once per (prompt, day)."""
+    today = date.fromordinal(ordinal)
+    return f"{prompt}\nToday is {today.strftime('%A')}, {today}."
+
+
+def _handoff(agent_cls, agent, instructions: str):
+    """Create the next workflow agent, carrying over room, chat context and userdata.
+
+    The RealtimeModel comes from the worker-level pool in agents.base, so a
+    handoff only allocates the Agent object itself.
+    """
+    return agent_cls(
+        instructions=instructions,
         room=agent.room,
         chat_ctx=agent.chat_ctx,
         userdata=agent.userdata,
@@ -180,15 +183,16 @@ def _create_email_phone_agent(agent):
     )
 
 
+def _create_email_phone_agent(agent):
+    """Create GetUserEmailPhoneAgent with correct prompt and date context."""
+    prompt = _select_contact_prompt(agent.userdata.reachability)
+    return _handoff(
+        GetUserEmailPhoneAgent, agent, _dated_prompt(prompt, date.today().toordinal())
+    )
+
+
 def _create_schedule_agent(agent):
     """Create ScheduleCallAgent with date context."""
-    today = date.today()
-    weekday = today.strftime("%A")
-    return ScheduleCallAgent(
-        instructions=prompts.ScheduleCallPrompt + f"\nToday is {weekday}, {today}.",
-        room=agent.room,
-        chat_ctx=agent.chat_ctx,
-        userdata=agent.userdata,
-        add_instruction=False,
-        temperature=LLM_TEMPERATURE_WORKFLOW,
+    return _handoff(
+        ScheduleCallAgent, agent, _dated_prompt(prompts.ScheduleCallPrompt, date.today().toordinal())
     )
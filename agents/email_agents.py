@@ -4,29 +4,128 @@ Completion agent — send appointment emails, offer summary, restart conversatio
 Replaces the old SendEmailAgent, SummaryAgent, SummarySenderAgent, and LastAgent
 with a single agent that uses 3 function tools.
 
-Used by: agents/main_agent.py (ConversationAgent -> CompletionAgent)
+Used by: agents/main_agent.py (ConversationAgent -> CompletionAgent),
+         agents/contact_agents.py (ScheduleCallAgent -> CompletionAgent)
 """
 
-import json
+import asyncio
 import logging
-from datetime import datetime
+from functools import partial
+from itertools import chain, islice
 
 from livekit.agents import function_tool
 
-from agents.base import BaseAgent
+from agents.base import AGENT_REGISTRY, BaseAgent, persist_conversation_bg, track_task
 from core.session_state import UserData, RunContext_T
 from config.company import COMPANY
+from config.settings import SMTP_CONFIG, LLM_TEMPERATURE_WORKFLOW
 from config.language import lang_hint
-from config.messages import UI_BUTTONS, FALLBACK_NOT_PROVIDED
-from utils.smtp import send_email, send_email_summary, send_lead_notification
-from utils.history import save_conversation_to_file
-from utils.webhook import send_session_webhook
-from utils.helpers import is_valid_email_syntax
+from config.messages import AGENT_MESSAGES, CLEAN_JSON, FALLBACK_NOT_PROVIDED, ui_buttons_json
+from utils.smtp import (
+    SMTPSession,
+    format_lead_products,
+    send_email,
+    send_email_summary,
+    send_lead_notification,
+)
+from utils.history import normalize_messages
+from utils.helpers import normalize_email
+import prompt.static_workflow as prompts
 
 logger = logging.getLogger(__name__)
 
 COMPANY_LEAD_EMAILS = COMPANY["lead_emails"]
 
+# Caps concurrent SMTP connections across all sessions in this worker
+_SMTP_SLOTS = asyncio.Semaphore(SMTP_CONFIG["max_connections"])
+
+
+def _run_smtp_lane(jobs: list) -> list[tuple]:
+    """Run (label, send) jobs back to back on one SMTP connection. Blocking.
+
+    Returns (label, ok, exc) per job.
+    """
+    results = []
+    with SMTPSession() as smtp:
+        for label, send in jobs:
+            try:
+                results.append((label, send(smtp=smtp), None))
+            except Exception as e:
+                results.append((label, False, e))
+    return results
+
+
+async def _deliver_appointment_emails(userdata: UserData, products: list) -> bool:
+    """Send the customer confirmation and all lead notifications.
+
+    Messages are spread over at most SMTP_CONFIG["max_connections"] lanes that
+    run concurrently; each lane reuses one connection for its messages.
+    Returns True if every lead notification was sent.
+    """
+    jobs = []
+    # 1. Customer confirmation email (nice-to-have — failure is OK)
+    if userdata.email:
+        jobs.append((None, partial(
+            send_email,
+            userdata.email,
+            userdata.schedule_date,
+            userdata.schedule_time,
+            products=products,
+        )))
+    else:
+        logger.info("No customer email on file — skipping confirmation email")
+
+    # 2. Lead notification to company (critical — log all failures)
+    lead_score = userdata.lead_score
+    confidence = userdata.lead_score * 10  # convert 0-10 to 0-100 scale
+    products_list = format_lead_products(products)  # same block for every recipient
+    for company_email in COMPANY_LEAD_EMAILS:
+        jobs.append((company_email, partial(
+            send_lead_notification,
+            company_email=company_email,
+            customer_name=userdata.name or FALLBACK_NOT_PROVIDED,
+            customer_email=userdata.email,
+            customer_phone=userdata.phone,
+            schedule_date=userdata.schedule_date,
+            schedule_time=userdata.schedule_time,
+            reachability=userdata.preferred_contact or FALLBACK_NOT_PROVIDED,
+            purchase_timing=FALLBACK_NOT_PROVIDED,
+            next_step=FALLBACK_NOT_PROVIDED,
+            lead_degree=lead_score,
+            confidence=confidence,
+            products=products,
+            products_list=products_list,
+        )))
+
+    if not jobs:
+        return True
+
+    async def _run(lane_jobs):
+        async with _SMTP_SLOTS:
+            return await asyncio.to_thread(_run_smtp_lane, lane_jobs)
+
+    lanes = min(SMTP_CONFIG["max_connections"], len(jobs))
+    lane_results = await asyncio.gather(*(_run(jobs[i::lanes]) for i in range(lanes)))
+
+    all_leads_sent = True
+    for company_email, ok, exc in chain.from_iterable(lane_results):
+        if company_email is None:
+            if exc is not None:
+                logger.error(f"Customer confirmation email crashed: {exc}")
+            elif ok:
+                logger.info("Customer confirmation email sent")
+            else:
+                logger.error("Customer confirmation email failed (SMTP returned False)")
+            continue
+        if exc is not None:
+            logger.error(f"Lead notification to {company_email} crashed: {exc}")
+        elif ok:
+            logger.info(f"Lead notification sent to {company_email}")
+        else:
+            logger.error(f"Lead notification to {company_email} failed")
+        all_leads_sent = all_leads_sent and ok
+    return all_leads_sent
+
 
 class CompletionAgent(BaseAgent):
     """Handles appointment confirmation, summary delivery, and conversation restart.
@@ -38,9 +137,6 @@ class CompletionAgent(BaseAgent):
     """
 
     def __init__(self, room, userdata, chat_ctx=None):
-        from config.settings import LLM_TEMPERATURE_WORKFLOW
-        import prompt.static_workflow as prompts
-
         super().__init__(
             instructions=prompts.COMPLETION_AGENT_PROMPT,
             room=room,
@@ -53,21 +149,12 @@ class CompletionAgent(BaseAgent):
     async def on_enter(self):
         """Show appointment confirmation or skip to summary offer."""
         logger.info("CompletionAgent on_enter")
-        try:
-            if self.userdata.schedule_date or self.userdata.schedule_time:
-                # Appointment was scheduled — show confirmation buttons
-                await self.room.local_participant.send_text(
-                    json.dumps(UI_BUTTONS["appointment_confirm"]),
-                    topic="trigger",
-                )
-            else:
-                # No appointment — show summary offer buttons
-                await self.room.local_participant.send_text(
-                    json.dumps(UI_BUTTONS["summary_offer"]),
-                    topic="trigger",
-                )
-        except Exception as e:
-            logger.error(f"CompletionAgent on_enter failed: {e}")
+        if self.userdata.schedule_date or self.userdata.schedule_time:
+            # Appointment was scheduled — show confirmation buttons
+            await self._show_buttons("appointment_confirm")
+        else:
+            # No appointment — show summary offer buttons
+            await self._show_buttons("summary_offer")
 
         # Trigger LLM to speak with the CompletionAgent prompt
         await super().on_enter()
@@ -86,64 +173,34 @@ class CompletionAgent(BaseAgent):
 
         if confirm:
             products = self.userdata.last_search_results or []
-
-            # 1. Customer confirmation email (nice-to-have — failure is OK)
-            if self.userdata.email:
-                try:
-                    success = send_email(
-                        self.userdata.email,
-                        self.userdata.schedule_date,
-                        self.userdata.schedule_time,
-                        products=products,
-                    )
-                    if success:
-                        logger.info("Customer confirmation email sent")
-                    else:
-                        logger.error("Customer confirmation email failed (SMTP returned False)")
-                except Exception as e:
-                    logger.error(f"Customer confirmation email crashed: {e}")
-            else:
-                logger.info("No customer email on file — skipping confirmation email")
-
-            # 2. Lead notification to company (critical — log all failures)
-            lead_score = self.userdata.lead_score
-            confidence = self.userdata.lead_score * 10  # convert 0-10 to 0-100 scale
-
-            for company_email in COMPANY_LEAD_EMAILS:
-                try:
-                    lead_sent = send_lead_notification(
-                        company_email=company_email,
-                        customer_name=self.userdata.name or FALLBACK_NOT_PROVIDED,
-                        customer_email=self.userdata.email,
-                        customer_phone=self.userdata.phone,
-                        schedule_date=self.userdata.schedule_date,
-                        schedule_time=self.userdata.schedule_time,
-                        reachability=self.userdata.preferred_contact or FALLBACK_NOT_PROVIDED,
-                        purchase_timing=FALLBACK_NOT_PROVIDED,
-                        next_step=FALLBACK_NOT_PROVIDED,
-                        lead_degree=lead_score,
-                        confidence=confidence,
-                        products=products,
-                    )
-                    if lead_sent:
-                        logger.info(f"Lead notification sent to {company_email}")
-                    else:
-                        logger.error(f"Lead notification to {company_email} failed")
-                except Exception as e:
-                    logger.error(f"Lead notification to {company_email} crashed: {e}")
+            # SMTP runs in the background so the reply isn't held up by it
+            track_task(self.userdata, asyncio.create_task(self._send_appointment_emails_bg(products)))
 
         # Show summary offer buttons
+        await self._show_buttons("summary_offer")
+
+        if confirm:
+            return f"Appointment confirmed and emails are on their way. Now thank the customer briefly and offer to send a conversation summary via email. The summary buttons are shown. {lang_hint()}"
+        return f"Customer declined the appointment. Acknowledge politely and offer to send a conversation summary via email. The summary buttons are shown. {lang_hint()}"
+
+    async def _show_buttons(self, button_type: str) -> None:
+        """Push a UI_BUTTONS payload to the frontend; failures are logged, not raised."""
         try:
             await self.room.local_participant.send_text(
-                json.dumps(UI_BUTTONS["summary_offer"]),
-                topic="trigger",
+                ui_buttons_json(button_type), topic="trigger"
             )
         except Exception as e:
-            logger.error(f"Summary offer buttons failed: {e}")
+            logger.error(f"{button_type} buttons failed: {e}")
 
-        if confirm:
-            return f"Appointment confirmed and emails sent. Now thank the customer briefly and offer to send a conversation summary via email. The summary buttons are shown. {lang_hint()}"
-        return f"Customer declined the appointment. Acknowledge politely and offer to send a conversation summary via email. The summary buttons are shown. {lang_hint()}"
+    async def _send_appointment_emails_bg(self, products: list) -> None:
+        """Deliver appointment + lead emails; tell the customer only if a lead was lost."""
+        try:
+            all_leads_sent = await _deliver_appointment_emails(self.userdata, products)
+        except Exception as e:
+            logger.error(f"Appointment emails crashed: {e}")
+            all_leads_sent = False
+        if not all_leads_sent and self._lang_listener_active:
+            await self._safe_reply(AGENT_MESSAGES["lead_email_failed"])
 
     # -----------------------------------------------------------------
     # Tool 2: Summary email
@@ -159,20 +216,14 @@ class CompletionAgent(BaseAgent):
         # Handle decline
         if email and email.strip().lower() == "decline":
             # Show new conversation buttons
-            try:
-                await self.room.local_participant.send_text(
-                    json.dumps(UI_BUTTONS["new_conversation"]),
-                    topic="trigger",
-                )
-            except Exception as e:
-                logger.error(f"New conversation buttons failed: {e}")
+            await self._show_buttons("new_conversation")
             return f"Customer declined summary. Thank them warmly and say goodbye. {lang_hint()}"
 
         # Determine recipient email
         recipient = None
         if email and email.strip():
-            clean_email = email.strip().lower()
-            if is_valid_email_syntax(clean_email):
+            clean_email = normalize_email(email)
+            if clean_email is not None:
                 self.userdata.email = clean_email
                 recipient = clean_email
             else:
@@ -185,39 +236,48 @@ class CompletionAgent(BaseAgent):
             return f"No email address available. Ask the customer for their email address to send the summary. {lang_hint()}"
 
         # Send the summary
-        summary_context = self.userdata.conversation_summary
-        if not summary_context:
-            # Fall back to session history if no agent-written summary
+        summary_context = self.userdata.conversation_summary or self._history_tail_summary()
+
+        async def _send_summary() -> bool:
             try:
-                from utils.history import normalize_messages
-                chat_history = list(self.session.history.items)
-                messages = normalize_messages(chat_history)
-                summary_context = "\n".join(
-                    f"{m['role']}: {m['message']}" for m in messages[-20:]
+                # LLM summary + SMTP are blocking — keep them off the event loop
+                return await asyncio.to_thread(
+                    send_email_summary, recipient, summary_context=summary_context
                 )
             except Exception as e:
-                logger.error(f"Failed to build summary from history: {e}")
-                summary_context = "No conversation summary available."
-
-        try:
-            success = send_email_summary(recipient, summary_context=summary_context)
-        except Exception as e:
-            logger.error(f"Summary email crashed: {e}")
-            success = False
+                logger.error(f"Summary email crashed: {e}")
+                return False
 
-        # Show new conversation buttons
-        try:
-            await self.room.local_participant.send_text(
-                json.dumps(UI_BUTTONS["new_conversation"]),
-                topic="trigger",
-            )
-        except Exception as e:
-            logger.error(f"New conversation buttons failed: {e}")
+        # New conversation buttons don't depend on the email — show them meanwhile
+        success, _ = await asyncio.gather(_send_summary(), self._show_buttons("new_conversation"))
 
         if success:
             return f"Summary email sent successfully to {recipient}. Thank the customer warmly and say goodbye. {lang_hint()}"
         return f"Summary email failed to send. Apologize briefly and say goodbye. {lang_hint()}"
 
+    def _history_tail_summary(self) -> str:
+        """Last 20 history messages as "role: message" lines — summary fallback
+        when the agent wrote no conversation_summary.
+
+        Memoized on userdata._summary_cache until the history grows; only the
+        tail of the history is walked, never the whole list.
+        """
+        try:
+            items = self.session.history.items
+            count = len(items)
+            cached = self.userdata._summary_cache
+            if cached is not None and cached[0] == count:
+                return cached[1]
+
+            tail = list(islice((m for m in reversed(items) if hasattr(m, "role")), 20))
+            tail.reverse()
+            rendered = "\n".join(f"{m['role']}: {m['message']}" for m in normalize_messages(tail))
+        except Exception as e:
+            logger.error(f"Failed to build summary from history: {e}")
+            return "No conversation summary available."
+        self.userdata._summary_cache = (count, rendered)
+        return rendered
+
     # -----------------------------------------------------------------
     # Tool 3: New conversation
     # -----------------------------------------------------------------
@@ -233,25 +293,17 @@ class CompletionAgent(BaseAgent):
         # 1. Clean the frontend
         try:
             await self.room.local_participant.send_text(
-                json.dumps({"clean": True}), topic="clean"
+                CLEAN_JSON, topic="clean"
             )
         except Exception as e:
             logger.error(f"Clean message failed: {e}")
 
-        # 2. Save conversation history + send webhook
+        # 2. Save conversation history + send webhook in the background
         logger.info("Starting new conversation — saving history and sending webhook")
-        try:
-            chat_history = list(self.session.history.items)
-
-            save_conversation_to_file(chat_history, self.userdata)
+        persist_conversation_bg(self.session.history.items, self.userdata)
 
-            session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            await send_session_webhook(session_id, chat_history, self.userdata)
+        # 3. Return a fresh ConversationAgent (same session-scoped task set)
+        return AGENT_REGISTRY["conversation"](room=self.room, userdata=self.userdata.next_conversation())
 
-            self.userdata._history_saved = True
-        except Exception as e:
-            logger.error(f"Failed to save conversation: {e}")
 
-        # 3. Return a fresh ConversationAgent
-        from agents.main_agent import ConversationAgent
-        return ConversationAgent(room=self.room, userdata=UserData())
+AGENT_REGISTRY["completion"] = CompletionAgent
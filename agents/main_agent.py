@@ -8,34 +8,75 @@ a single LLM-driven agent that uses function tools for all side effects.
 Used by: agent.py (entrypoint), agents/email_agents.py (CompletionAgent restart)
 """
 
-import json
 import asyncio
+import contextlib
 import logging
+from functools import lru_cache
+from itertools import islice
 from typing import AsyncIterable, List, Dict, Any
 
 from livekit.agents import function_tool, ModelSettings, Agent
 from livekit.rtc import DataPacket
 
-from agents.base import safe_generate_reply, create_realtime_model, _NEW_CONV_KEYS
+from agents.base import AGENT_REGISTRY, safe_generate_reply, send_text_bg, spawn, cancel_spawned, relay_transcript, running_activity, create_realtime_model, persist_conversation_bg, _HANDLED_TOPICS, is_new_conversation
 from core.session_state import UserData, RunContext_T
-from config.messages import AGENT_MESSAGES, UI_BUTTONS, CONVERSATION_RULES
+from config.messages import AGENT_MESSAGES, CLEAN_JSON, CONVERSATION_RULES, ui_buttons_json
 from config.language import (
     handle_language_update,
     language_manager,
-    get_language_instruction,
-    get_language_prefix,
+    get_language_block,
     lang_hint,
 )
 from prompt.static_main_agent import CONVERSATION_AGENT_PROMPT, CONVERSATION_AGENT_GREETING
-from datetime import datetime
-from utils.helpers import get_greeting, is_valid_email_syntax
-from utils.history import normalize_messages, save_conversation_to_file
-from utils.webhook import send_session_webhook
-from utils.search_pipeline import SearchPipeline
+from utils import fastjson
+from utils.helpers import get_greeting, normalize_email
+from utils.history import last_message
+from utils.search_pipeline import get_search_pipeline
 
 logger = logging.getLogger(__name__)
 
 
+# Pinecone metadata field -> label in the LLM context, in output order
+_RESULT_FIELDS = (
+    ("Introduction", "Description: "),
+    ("Features", "Details: "),
+    ("Benefits to Clients", "Benefits: "),
+    ("url", "URL: "),
+)
+
+
+# Greeting template split around its one placeholder, so on_enter concatenates
+# instead of re-parsing the format string
+_GREETING_HEAD, _GREETING_TAIL = CONVERSATION_AGENT_GREETING.split("{greeting_prefix}")
+
+# Static tail of every search context
+_CONTEXT_TRAILER = "\n=== CONVERSATION RULES ===\n" + CONVERSATION_RULES
+
+
+_CONTACT_CHANNELS = frozenset({"phone", "whatsapp", "email"})
+_LEAD_LEVELS = frozenset({"HOT", "WARM", "COOL", "MILD"})
+_SEARCH_CATEGORIES = frozenset({"service", "product"})
+
+_FALLBACK_IMAGE = ["https://image.ayand.cloud/BL_logo.png"]
+
+
+def _frontend_item(item: Dict[str, Any], category: str) -> Dict[str, Any]:
+    """Pinecone metadata -> card shape the frontend "products" topic expects."""
+    image_link = item.get("image_link")
+    return {
+        "product_name": item.get("name", "Unknown"),
+        "url": item.get("url", ""),
+        "category": category,
+        "image": [image_link] if image_link else _FALLBACK_IMAGE,
+    }
+
+
+@lru_cache(maxsize=16)
+def _full_instructions(language_code: str) -> str:
+    """Conversation prompt + language block, built once per language."""
+    return CONVERSATION_AGENT_PROMPT + get_language_block(language_code)
+
+
 # =============================================================================
 # CONVERSATION AGENT
 # =============================================================================
@@ -66,19 +107,16 @@ class ConversationAgent(Agent):
             self.userdata = userdata
         self.first_message = first_message
         self.room = room
-        self.search_pipeline = SearchPipeline()
+        self.search_pipeline = get_search_pipeline()
+        self._inflight: Dict[tuple, asyncio.Future] = {}
         self._original_instructions = CONVERSATION_AGENT_PROMPT
         self._lang_listener_active = True
-
-        # Register data received callback for language updates
-        self._setup_data_listener()
+        self._lang_version = language_manager.version
 
         llm_model = create_realtime_model()
 
         # Include language prefix and suffix for maximum emphasis
-        instructions_with_language = (
-            get_language_prefix() + CONVERSATION_AGENT_PROMPT + get_language_instruction()
-        )
+        instructions_with_language = _full_instructions(language_manager.get_language())
 
         super().__init__(
             llm=llm_model,
@@ -89,66 +127,83 @@ class ConversationAgent(Agent):
     # LANGUAGE HANDLING — listen for frontend language changes
     # ══════════════════════════════════════════════════════════════════════════
 
-    def _setup_data_listener(self) -> None:
-        """Set up listener for incoming data from frontend (e.g., language changes)."""
-        @self.room.on("data_received")
-        def on_data_received(data: DataPacket):
-            asyncio.create_task(self._handle_data_received(data))
+    def _on_data_packet(self, data: DataPacket) -> None:
+        """Handle incoming data packets from frontend.
 
-    async def _handle_data_received(self, data: DataPacket) -> None:
-        """Handle incoming data packets from frontend."""
+        Called synchronously by the session-level dispatcher in agent.py for the
+        current agent only. Only awaiting work is moved onto a task.
+        """
         if not self._lang_listener_active:
             return
+        # Only these topics carry JSON we act on — skip everything else undecoded
+        if data.topic not in _HANDLED_TOPICS:
+            return
         try:
-            payload = (
-                data.data.decode("utf-8") if isinstance(data.data, bytes) else data.data
-            )
-            parsed = json.loads(payload)
-
-            if data.topic == "language":
-                logger.info(f"Received language update: {parsed}")
-                if handle_language_update(parsed):
-                    new_lang = language_manager.get_language()
-                    logger.info(f"Language successfully changed to: {new_lang}")
-                    await self._update_agent_instructions()
-                else:
-                    logger.warning(f"Failed to update language: {parsed}")
-
-            elif data.topic == "trigger":
-                if isinstance(parsed, dict):
-                    # Check for new conversation button first
-                    for key in parsed.keys():
-                        if str(key).lower() in _NEW_CONV_KEYS:
-                            logger.info("New conversation button clicked in ConversationAgent")
-                            if hasattr(self, "session") and self.session:
-                                await self.session.generate_reply(
-                                    user_input="I want to start a new conversation"
-                                )
-                            return
-                    # Normal button — inject value as user input
-                    value = next(iter(parsed.values()), None)
-                    if value and hasattr(self, "session") and self.session:
-                        logger.info(f"Button clicked — injecting as user input: {value}")
-                        await self.session.generate_reply(user_input=str(value))
-
-        except json.JSONDecodeError as e:
+            # Parses bytes directly — no separate UTF-8 decode step
+            parsed = fastjson.loads(data.data)
+        except fastjson.JSONDecodeError as e:
             logger.debug(f"Data received is not valid JSON: {e}")
+            return
+
+        if data.topic == "language":
+            self._apply_language(parsed)
+        elif data.topic == "trigger" and isinstance(parsed, dict):
+            spawn(self.userdata, self._handle_trigger(parsed), name="trigger")
+
+    def _apply_language(self, parsed) -> None:
+        """Apply a frontend language update; rebuild instructions only on an actual change."""
+        try:
+            logger.info(f"Received language update: {parsed}")
+            old_lang = language_manager.get_language()
+            if not handle_language_update(parsed):
+                logger.warning(f"Failed to update language: {parsed}")
+                return
+            new_lang = language_manager.get_language()
+            if new_lang == old_lang:
+                logger.debug(f"Language already set to {new_lang} — skipping instruction update")
+                return
+            logger.info(f"Language successfully changed to: {new_lang}")
+            spawn(self.userdata, self._update_agent_instructions(), name="language_update")
         except Exception as e:
-            logger.error(f"Error handling data received: {e}")
+            logger.error(f"Error handling language update: {e}")
+
+    async def _handle_trigger(self, parsed: dict) -> None:
+        """Handle a button response (topic: "trigger") by injecting it as user input."""
+        try:
+            # Check for new conversation button first
+            if is_new_conversation(parsed):
+                logger.info("New conversation button clicked in ConversationAgent")
+                if hasattr(self, "session") and self.session:
+                    await self.session.generate_reply(
+                        user_input="I want to start a new conversation"
+                    )
+                return
+            # Normal button — inject value as user input
+            value = next(iter(parsed.values()), None)
+            if value and hasattr(self, "session") and self.session:
+                logger.info(f"Button clicked — injecting as user input: {value}")
+                await self.session.generate_reply(user_input=str(value))
+
+        except Exception as e:
+            logger.error(f"Error handling trigger response: {e}")
 
     async def _update_agent_instructions(self) -> None:
         """Update the agent's instructions with current language setting."""
         try:
+            # Already built for this language — nothing to push
+            if language_manager.version == self._lang_version:
+                return
+            self._lang_version = language_manager.version
             # Capture language immediately before any await to prevent stale reads
             new_lang = language_manager.get_language()
-            instructions = self._original_instructions
-            new_instructions = (
-                get_language_prefix() + instructions + get_language_instruction()
-            )
+            new_instructions = _full_instructions(new_lang)
 
-            self._instructions = new_instructions
-            if hasattr(self, "_activity") and self._activity:
-                await self._activity.update_instructions(new_instructions)
+            # Language flipped back before this ran — same text, no session update
+            if new_instructions != self._instructions:
+                self._instructions = new_instructions
+                activity = running_activity(self)
+                if activity:
+                    await activity.update_instructions(new_instructions)
 
             # Update transcription language hint (uses captured new_lang)
             if hasattr(self, "session") and self.session and self.session.llm:
@@ -181,7 +236,7 @@ class ConversationAgent(Agent):
             try:
                 greeting_prefix = get_greeting()
                 await self._safe_reply(
-                    CONVERSATION_AGENT_GREETING.format(greeting_prefix=greeting_prefix)
+                    _GREETING_HEAD + greeting_prefix + _GREETING_TAIL
                 )
             except Exception as e:
                 logger.error(f"ConversationAgent greeting failed: {e}")
@@ -197,7 +252,7 @@ class ConversationAgent(Agent):
 
     async def _safe_reply(self, instructions: str) -> bool:
         """Convenience wrapper — calls safe_generate_reply with language injection."""
-        instructions = get_language_prefix() + instructions + get_language_instruction()
+        instructions = instructions + get_language_block()
         return await safe_generate_reply(self.session, self.room, instructions)
 
     # ══════════════════════════════════════════════════════════════════════════
@@ -209,23 +264,13 @@ class ConversationAgent(Agent):
         if not results:
             return f"No matching treatments found. {lang_hint()}"
 
-        formatted = []
-        for item in results[:max_results]:
-            name = item.get("name", "Unknown treatment")
-            desc_parts = [f"**{name}**"]
-
-            if "Introduction" in item:
-                desc_parts.append(f"Description: {item['Introduction']}")
-            if "Features" in item:
-                desc_parts.append(f"Details: {item['Features']}")
-            if "Benefits to Clients" in item:
-                desc_parts.append(f"Benefits: {item['Benefits to Clients']}")
-            if "url" in item:
-                desc_parts.append(f"URL: {item['url']}")
-
-            formatted.append("\n".join(desc_parts))
-
-        return "\n\n---\n\n".join(formatted)
+        return "\n\n---\n\n".join(
+            "".join((
+                f"**{item.get('name', 'Unknown treatment')}**",
+                *(f"\n{label}{item[key]}" for key, label in _RESULT_FIELDS if key in item),
+            ))
+            for item in islice(results, max_results)
+        )
 
     # ══════════════════════════════════════════════════════════════════════════
     # FUNCTION TOOL 1 — SEARCH (Services & Products)
@@ -263,92 +308,96 @@ class ConversationAgent(Agent):
     ) -> str:
         """Core search logic — queries Pinecone index, sends to frontend, returns LLM context."""
         # Validate category
-        valid_categories = ["service", "product"]
-        if category not in valid_categories:
+        if category not in _SEARCH_CATEGORIES:
             logger.warning(f"Invalid category '{category}', defaulting to 'service'")
             category = "service"
 
-        # Get conversation history
-        history = self._chat_ctx.items
-        cleaned_history = normalize_messages(history)
+        # Only the newest message matters — read it from the tail, not the whole history
+        last = last_message(self._chat_ctx.items)
 
-        if cleaned_history and cleaned_history[-1]["role"] != "user":
+        if last and last["role"] != "user":
             return f"Waiting for customer message. {lang_hint()}"
 
         # Update search counter
         self.userdata.search_count += 1
 
-        user_messages = [
-            chat["message"] for chat in cleaned_history if chat["role"] == "user"
-        ]
-        last_user_msg = user_messages[-1] if user_messages else ""
+        last_user_msg = last["message"] if last else ""
 
         # Query Pinecone index based on category
         try:
-            if category == "product":
-                search_results = await asyncio.to_thread(
-                    self.search_pipeline.search_products,
-                    query=last_user_msg,
-                    top_k=5,
-                )
-            else:
-                search_results = await asyncio.to_thread(
-                    self.search_pipeline.search_services,
-                    query=last_user_msg,
-                    top_k=5,
-                )
+            search_results = await self._query_index(category, last_user_msg)
         except Exception as e:
             logger.error(f"Pinecone search failed: {e}")
             search_results = []
 
+        top5 = search_results[:5]
+
         # Format for LLM context
-        results_text = self._format_pinecone_results_for_llm(search_results)
+        results_text = self._format_pinecone_results_for_llm(top5)
 
         # Send results to frontend via "products" topic
-        try:
-            frontend_payload = []
-            for item in search_results[:5]:
-                frontend_payload.append({
-                    "product_name": item.get("name", "Unknown"),
-                    "url": item.get("url", ""),
-                    "category": category,
-                    "image": [item.get("image_link", "")] if item.get("image_link") else ["https://image.ayand.cloud/BL_logo.png"],
-                })
-
-            logger.info(
-                f"Frontend results (category={category}): "
-                f"{[p['product_name'] for p in frontend_payload]}"
-            )
-
-            if frontend_payload:
-                asyncio.create_task(
-                    self.room.local_participant.send_text(
-                        json.dumps(frontend_payload),
-                        topic="products",
-                    )
-                )
-        except Exception as e:
-            logger.error(f"Failed to send results to frontend: {e}")
+        frontend_payload = [_frontend_item(item, category) for item in top5]
+        product_names = [p["product_name"] for p in frontend_payload]
+        logger.info(f"Frontend results (category={category}): {product_names}")
+        if frontend_payload:
+            try:
+                send_text_bg(self.userdata, self.room, fastjson.dumps(frontend_payload), "products")
+            except Exception as e:
+                logger.error(f"Failed to send results to frontend: {e}")
 
         # Store results in userdata
-        self.userdata.last_search_results = search_results[:5]
+        self.userdata.last_search_results = top5
 
-        # Build LLM context
+        # Build LLM context (conversation rules last, then the language block)
         category_label = "PRODUCT" if category == "product" else "SERVICE"
-        context_parts = [
+        context_parts = (
             f"USER QUERY: {last_user_msg}",
             f"SEARCH NUMBER: {self.userdata.search_count}",
             "",
             f"=== RELEVANT {category_label} DATA ===",
             results_text,
             f"Also explain shortly about these {category}s and their relation with user query: "
-            f"{[p['product_name'] for p in frontend_payload]}",
-        ]
+            f"{product_names!r}",
+            _CONTEXT_TRAILER,
+            get_language_block(),
+        )
+        return "\n".join(context_parts)
 
-        # Append conversation rules
-        context_parts.extend(["", "=== CONVERSATION RULES ===", CONVERSATION_RULES])
+    async def _query_index(self, category: str, query: str) -> List[Dict[str, Any]]:
+        """Run one Pinecone search, single-flight: while a search for the same
+        (category, query) is in flight, later callers await its result instead
+        of issuing a duplicate request.
 
-        return get_language_prefix() + "\n".join(context_parts) + get_language_instruction()
+        A leader that is cancelled (e.g. its speech was interrupted) resolves
+        the future with None instead of cancelling it, so its followers don't
+        inherit the cancellation — they run the search themselves instead.
+        """
+        key = (category, " ".join(query.lower().split()))
+        while (pending := self._inflight.get(key)) is not None:
+            # shield: a cancelled follower must not cancel the leader's search
+            results = await asyncio.shield(pending)
+            if results is not None:
+                return results
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            search = (
+                self.search_pipeline.search_products_async if category == "product"
+                else self.search_pipeline.search_services_async
+            )
+            results = await search(query=query, top_k=5)
+            future.set_result(results)
+            return results
+        except asyncio.CancelledError:
+            future.set_result(None)  # leader gone — followers search on their own
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved — no followers is not an error
+            raise
+        finally:
+            del self._inflight[key]
 
     # ══════════════════════════════════════════════════════════════════════════
     # FUNCTION TOOL 2 — ASSESS LEAD INTEREST
@@ -372,9 +421,8 @@ class ConversationAgent(Agent):
             reasoning: Brief explanation (e.g., "Asked about prices for 2 treatments and mentioned wanting to book soon")
         """
         self.userdata.lead_score = max(0, min(10, score))
-        self.userdata.lead_level = (
-            level.upper() if level.upper() in ("HOT", "WARM", "COOL", "MILD") else "MILD"
-        )
+        level = level.upper()
+        self.userdata.lead_level = level if level in _LEAD_LEVELS else "MILD"
         self.userdata.lead_reasoning = reasoning.strip()
         logger.info(f"Lead assessed: score={score}, level={level}, reason={reasoning}")
         return f"Lead assessment saved. Continue naturally. {lang_hint()}"
@@ -393,15 +441,7 @@ class ConversationAgent(Agent):
         if self.userdata.expert_offered:
             return f"Expert connection already offered. Do not offer again. {lang_hint()}"
         self.userdata.expert_offered = True
-        try:
-            await self.room.local_participant.send_text(
-                json.dumps(
-                    UI_BUTTONS.get("expert_offer", {"Ja": "Ja", "Nein": "Nein"})
-                ),
-                topic="trigger",
-            )
-        except Exception as e:
-            logger.error(f"Failed to send expert buttons: {e}")
+        send_text_bg(self.userdata, self.room, ui_buttons_json("expert_offer"), "trigger")
         logger.info("Expert connection offered to customer")
         return f"Buttons sent. Wait for customer response. {lang_hint()}"
 
@@ -449,47 +489,55 @@ class ConversationAgent(Agent):
             phone: Customer's phone number
             preferred_contact: How they prefer to be reached: "phone", "whatsapp", or "email"
         """
-        # Save all non-email fields first
+        # Save all non-email fields first. Repeat calls re-send known values —
+        # unchanged ones are not re-assigned (keeps UserData's str cache warm).
         if name:
-            self.userdata.name = name.strip().title()
-            logger.info(f"Saved name: {self.userdata.name}")
+            name = name.strip().title()
+            if name != self.userdata.name:
+                self.userdata.name = name
+                logger.info(f"Saved name: {name}")
         if phone:
-            self.userdata.phone = phone.strip()
-            logger.info(f"Saved phone: {self.userdata.phone}")
-        if preferred_contact and preferred_contact in ("phone", "whatsapp", "email"):
+            phone = phone.strip()
+            if phone != self.userdata.phone:
+                self.userdata.phone = phone
+                logger.info(f"Saved phone: {phone}")
+        if preferred_contact in _CONTACT_CHANNELS and preferred_contact != self.userdata.preferred_contact:
             self.userdata.preferred_contact = preferred_contact
             logger.info(f"Saved preferred contact: {preferred_contact}")
 
         # Validate and save email last (so other fields are not lost on invalid email)
         if email:
-            if is_valid_email_syntax(email.strip()):
-                self.userdata.email = email.strip().lower()
-                logger.info(f"Saved email: {self.userdata.email}")
-            else:
+            clean_email = normalize_email(email)
+            if clean_email is None:
                 return f"Email seems invalid. Other info saved. Ask for email again. {lang_hint()}"
+            if clean_email != self.userdata.email:
+                self.userdata.email = clean_email
+                logger.info(f"Saved email: {clean_email}")
 
         # Check if enough contact info is now available for consent step
-        has_name = bool(self.userdata.name)
-        has_contact = bool(self.userdata.email) or bool(self.userdata.phone)
-        needs_phone = self.userdata.preferred_contact == "phone" and not self.userdata.phone
+        ud = self.userdata
+        has_name = bool(ud.name)
+        has_contact = bool(ud.email or ud.phone)
+        needs_phone = ud.preferred_contact == "phone" and not ud.phone
+        ready = has_name and has_contact and not needs_phone  # consent step can start
 
-        if has_name and has_contact and not needs_phone and not self.userdata.consent_given:
+        if ready and not ud.consent_given:
             # If phone was provided but no reachability time yet, ask first
-            if self.userdata.phone and not self.userdata.schedule_date and not self.userdata.schedule_time:
+            if ud.phone and not ud.schedule_date and not ud.schedule_time:
                 return (
                     f"Contact info saved. The customer provided a phone number. "
                     f"Ask when they are best reachable by phone (preferred day and time). "
                     f"Call schedule_appointment(date, time) to save it, then proceed to consent. {lang_hint()}"
                 )
-            if not self.userdata.consent_buttons_shown:
+            if not ud.consent_buttons_shown:
                 # Auto-send consent buttons
                 buttons_sent = False
                 try:
                     await self.room.local_participant.send_text(
-                        json.dumps(UI_BUTTONS.get("consent", {"Yes": "Yes", "No": "No"})),
+                        ui_buttons_json("consent"),
                         topic="trigger",
                     )
-                    self.userdata.consent_buttons_shown = True
+                    ud.consent_buttons_shown = True
                     buttons_sent = True
                     logger.info("Consent buttons auto-sent after contact info complete")
                 except Exception as e:
@@ -511,7 +559,7 @@ class ConversationAgent(Agent):
                     f"Contact info saved. Consent buttons already shown. "
                     f"Ask for consent if not yet given, then call record_consent(). {lang_hint()}"
                 )
-        elif has_name and has_contact and not needs_phone and self.userdata.consent_given:
+        elif ready:
             return (
                 f"Contact info saved. All requirements met. "
                 f"Call save_conversation_summary() then complete_contact_collection(). {lang_hint()}"
@@ -536,16 +584,17 @@ class ConversationAgent(Agent):
         """
         if self.userdata.consent_buttons_shown:
             return f"Consent buttons already shown. Do not show again. {lang_hint()}"
+        # Awaited, not fire-and-forget: the flag below blocks any retry, so it is
+        # only set once the buttons were actually published
         try:
-            await self.room.local_participant.send_text(
-                json.dumps(
-                    UI_BUTTONS.get("consent", {"Yes": "Yes", "No": "No"})
-                ),
-                topic="trigger",
-            )
-            self.userdata.consent_buttons_shown = True
+            await self.room.local_participant.send_text(ui_buttons_json("consent"), topic="trigger")
         except Exception as e:
             logger.error(f"Failed to send consent buttons: {e}")
+            return (
+                f"Buttons failed to send. "
+                f"Ask for GDPR consent verbally and call record_consent(). {lang_hint()}"
+            )
+        self.userdata.consent_buttons_shown = True
         logger.info("Consent buttons sent to customer")
         return f"Consent buttons sent. Now ask for consent verbally and wait for response. {lang_hint()}"
 
@@ -641,16 +690,9 @@ class ConversationAgent(Agent):
         self._lang_listener_active = False
 
         # Send clean signal to frontend
-        try:
-            await self.room.local_participant.send_text(
-                json.dumps({"clean": True}), topic="clean"
-            )
-        except Exception as e:
-            logger.error(f"Clean message failed: {e}")
+        send_text_bg(self.userdata, self.room, CLEAN_JSON, "clean")
 
-        from agents.email_agents import CompletionAgent
-
-        return CompletionAgent(
+        return AGENT_REGISTRY["completion"](
             room=self.room,
             userdata=self.userdata,
         )
@@ -670,7 +712,8 @@ class ConversationAgent(Agent):
             return f"Already shown. Do not call again. {lang_hint()}"
 
         try:
-            # Query Pinecone for featured services
+            # Same fixed queries every session — repeat calls are served by
+            # the pipeline's process-wide featured_cache
             featured_results = await asyncio.to_thread(
                 self.search_pipeline.get_featured_services,
                 treatments_count=3,
@@ -678,23 +721,14 @@ class ConversationAgent(Agent):
                 wellness_count=2,
             )
 
-            showcase = []
-            for item in featured_results:
-                category = item.get("category", "treatments")
-                showcase.append({
-                    "product_name": item.get("name", "Unknown"),
-                    "url": item.get("url", ""),
-                    "category": category,
-                    "image": [item.get("image_link", "")] if item.get("image_link") else ["https://image.ayand.cloud/BL_logo.png"],
-                })
+            showcase = [
+                _frontend_item(item, item.get("category", "treatments"))
+                for item in featured_results
+            ]
 
             if showcase:
                 self.userdata.featured_shown = True
-                asyncio.create_task(
-                    self.room.local_participant.send_text(
-                        json.dumps(showcase), topic="products"
-                    )
-                )
+                send_text_bg(self.userdata, self.room, fastjson.dumps(showcase), "products")
                 service_names = [p["product_name"] for p in showcase]
                 logger.info(f"Featured services sent: {service_names}")
                 return (
@@ -720,13 +754,7 @@ class ConversationAgent(Agent):
         insists on leaving and you have already tried to help them further.
         You MUST call save_conversation_summary() BEFORE calling this.
         """
-        try:
-            await self.room.local_participant.send_text(
-                json.dumps(UI_BUTTONS["new_conversation"]),
-                topic="trigger",
-            )
-        except Exception as e:
-            logger.error(f"New conversation button failed: {e}")
+        send_text_bg(self.userdata, self.room, ui_buttons_json("new_conversation"), "trigger")
         return f"New conversation button shown. Say a brief warm goodbye. {lang_hint()}"
 
     # ══════════════════════════════════════════════════════════════════════════
@@ -739,43 +767,32 @@ class ConversationAgent(Agent):
         self._lang_listener_active = False
         try:
             await self.room.local_participant.send_text(
-                json.dumps({"clean": True}), topic="clean"
+                CLEAN_JSON, topic="clean"
             )
         except Exception as e:
             logger.error(f"Clean message failed: {e}")
 
         logger.info("Starting new conversation from ConversationAgent")
-        try:
-            chat_history = list(self.session.history.items)
-            save_conversation_to_file(chat_history, self.userdata)
-            session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            await send_session_webhook(session_id, chat_history, self.userdata)
-            self.userdata._history_saved = True
-        except Exception as e:
-            logger.error(f"Failed to save conversation: {e}")
+        persist_conversation_bg(self.session.history.items, self.userdata)
 
-        return ConversationAgent(room=self.room, userdata=UserData())
+        return ConversationAgent(room=self.room, userdata=self.userdata.next_conversation())
 
     # ══════════════════════════════════════════════════════════════════════════
-    # TRANSCRIPTION — streams text to frontend via "message" topic
+    # TRANSCRIPTION — sends text to frontend via "message" (+ optional "message_delta")
     # ══════════════════════════════════════════════════════════════════════════
 
     async def transcription_node(
         self, text: AsyncIterable[str], model_settings: ModelSettings
     ) -> AsyncIterable[str]:
-        agent_response = ""
-        async for delta in text:
-            agent_response += delta
-            yield delta
+        # aclosing: the relay's done marker and sender shutdown run as soon as
+        # this node is closed (interruption), not at asyncgen finalization
+        async with contextlib.aclosing(relay_transcript(self.userdata, self.room, text)) as relay:
+            async for delta in relay:
+                yield delta
 
-        # Send complete message to frontend
-        try:
-            await self.room.local_participant.send_text(
-                json.dumps({"agent_response": agent_response}),
-                topic="message",
-            )
-        except Exception as e:
-            logger.error(f"Failed to send transcription: {e}")
+    async def on_exit(self) -> None:
+        # Same as BaseAgent.on_exit: stop this agent's button/language handlers
+        await cancel_spawned(self.userdata, keep=("send", None))
 
     # ══════════════════════════════════════════════════════════════════════════
     # INSTRUCTION UPDATE — preserves chat context across language changes
@@ -791,12 +808,19 @@ class ConversationAgent(Agent):
         Args:
             instructions: The new instructions to set for the agent.
         """
+        if instructions == self._instructions:
+            return
+
         current_chat_ctx = self._chat_ctx
 
         self._instructions = instructions
 
-        if hasattr(self, "_activity") and self._activity:
-            await self._activity.update_instructions(instructions)
+        activity = running_activity(self)
+        if activity:
+            await activity.update_instructions(instructions)
 
-        if current_chat_ctx:
+        if current_chat_ctx and self._chat_ctx is not current_chat_ctx:
             self._chat_ctx = current_chat_ctx
+
+
+AGENT_REGISTRY["conversation"] = ConversationAgent
@@ -5,33 +5,30 @@ These ask a question, show buttons, and transition to the next agent.
 Used by: agents/main_agent.py (connect_to_expert → PurchaseTimingAgent)
 """
 
-import json
 import asyncio
 import logging
 from livekit.agents import function_tool
 from agents.base import BaseAgent, safe_generate_reply
 from core.session_state import RunContext_T
-from config.services import SERVICES
+from config.services import services_json
 from config.messages import QUALIFICATION_QUESTIONS
-from config.language import get_language_prefix, get_language_instruction
+from config.language import get_language_block
 from config.settings import LLM_TEMPERATURE_WORKFLOW
 import prompt.static_workflow as prompts
 
 logger = logging.getLogger(__name__)
 
 
-async def _question_enter(agent, question: str, buttons: dict, label: str):
+async def _question_enter(agent, question: str, buttons: str, label: str):
     """Shared on_enter — guaranteed not to crash the agent."""
     logger.info(f"{label} on_enter called")
     # Inject language instruction into the question
-    question_with_language = get_language_prefix() + question + get_language_instruction()
+    question_with_language = question + get_language_block()
     await safe_generate_reply(agent.session, agent.room, question_with_language)
 
     try:
         await asyncio.sleep(0.5)
-        await agent.room.local_participant.send_text(
-            json.dumps(buttons), topic="trigger"
-        )
+        await agent.room.local_participant.send_text(buttons, topic="trigger")
     except Exception as e:
         logger.error(f"{label} send_text failed: {e}")
 
@@ -43,7 +40,7 @@ class PurchaseTimingAgent(BaseAgent):
         await _question_enter(
             self,
             question=QUALIFICATION_QUESTIONS["purchase_timing"],
-            buttons=SERVICES["purchase_timing"],
+            buttons=services_json("purchase_timing"),
             label="PurchaseTimingAgent",
         )
 
@@ -76,7 +73,7 @@ class NextStepAgent(BaseAgent):
         await _question_enter(
             self,
             question=QUALIFICATION_QUESTIONS["next_step"],
-            buttons=SERVICES["service_options"],
+            buttons=services_json("service_options"),
             label="NextStepAgent",
         )
 
@@ -110,7 +107,7 @@ class ReachabilityAgent(BaseAgent):
         await _question_enter(
             self,
             question=QUALIFICATION_QUESTIONS["reachability"],
-            buttons=SERVICES["reachability"],
+            buttons=services_json("reachability"),
             label="ReachabilityAgent",
         )
 
@@ -15,13 +15,14 @@ Usage:
 """
 
 import logging
+from functools import lru_cache
 from typing import Optional
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LanguageConfig:
     """Configuration for a supported language."""
     code: str
@@ -259,6 +260,7 @@ class LanguageManager:
 
     def __init__(self, default_language: str = "en"):
         self._current_language: str = default_language
+        self.version: int = 0  # Bumped on every actual change — cheap staleness check
         self._on_language_change_callbacks: list[callable] = []
 
     def get_language(self) -> str:
@@ -283,6 +285,7 @@ class LanguageManager:
         self._current_language = language_code
 
         if old_language != language_code:
+            self.version += 1
             logger.info(f"Language changed: {old_language} -> {language_code}")
             self._notify_callbacks(old_language, language_code)
 
@@ -308,14 +311,10 @@ class LanguageManager:
 language_manager = LanguageManager(default_language="de")
 
 
-def get_language_instruction() -> str:
-    """
-    Get the language instruction to append to prompts.
-
-    Returns a highly emphasized instruction string that tells the agent
-    to respond in the currently configured language.
-    """
-    config = language_manager.get_language_config()
+@lru_cache(maxsize=16)
+def _cached_suffix(language_code: str) -> str:
+    """Build (once per language) the instruction block appended to prompts."""
+    config = SUPPORTED_LANGUAGES.get(language_code, SUPPORTED_LANGUAGES["de"])
     return f"""
 
 {config.instruction}
@@ -328,26 +327,63 @@ Every word must be in {config.name}. No exceptions. No mixing.
 ### END LANGUAGE LOCK ###"""
 
 
+@lru_cache(maxsize=16)
+def _cached_prefix(language_code: str) -> str:
+    """Build (once per language) the short prefix prepended to prompts."""
+    config = SUPPORTED_LANGUAGES.get(language_code, SUPPORTED_LANGUAGES["de"])
+    return f"""⚠️ LANGUAGE LOCK: {config.name.upper()} ({config.native_name}) — ALL responses MUST be in {config.name}. No exceptions. No mixing. Every word, every sentence, every turn — {config.name} ONLY.
+
+"""
+
+
+def get_language_instruction() -> str:
+    """
+    Get the language instruction to append to prompts.
+
+    Returns a highly emphasized instruction string that tells the agent
+    to respond in the currently configured language.
+    """
+    return _cached_suffix(language_manager.get_language())
+
+
 def get_language_prefix() -> str:
     """
     Get a short language prefix to prepend at the very beginning of prompts.
 
     This ensures the language instruction is seen first by the LLM.
     """
-    config = language_manager.get_language_config()
-    return f"""⚠️ LANGUAGE LOCK: {config.name.upper()} ({config.native_name}) — ALL responses MUST be in {config.name}. No exceptions. No mixing. Every word, every sentence, every turn — {config.name} ONLY.
+    return _cached_prefix(language_manager.get_language())
 
-"""
 
+@lru_cache(maxsize=16)
+def _cached_block(language_code: str) -> str:
+    return "\n\n" + _cached_prefix(language_code) + _cached_suffix(language_code).lstrip("\n")
 
-def lang_hint() -> str:
-    """Short language reminder appended to tool return strings."""
-    config = language_manager.get_language_config()
+
+def get_language_block(language_code: str | None = None) -> str:
+    """
+    Language prefix + instruction as a single block to append after a prompt.
+
+    Static prompt text goes first so it is a byte-identical prefix across
+    sessions and languages (provider-side prompt caching); the language
+    directives close the prompt, where the LLM reads them last.
+    """
+    return _cached_block(language_code or language_manager.get_language())
+
+
+@lru_cache(maxsize=16)
+def _cached_hint(language_code: str) -> str:
+    config = SUPPORTED_LANGUAGES.get(language_code, SUPPORTED_LANGUAGES["de"])
     if config.code == "de":
         return "[LANGUAGE: German] Respond ONLY in German (formal Sie)."
     return f"[LANGUAGE: {config.name}] Respond ONLY in {config.name}."
 
 
+def lang_hint() -> str:
+    """Short language reminder appended to tool return strings (built once per language)."""
+    return _cached_hint(language_manager.get_language())
+
+
 def handle_language_update(data: dict) -> bool:
     """
     Handle incoming language update from frontend.
@@ -4,7 +4,7 @@ Usage: from config.messages import AGENT_MESSAGES (unchanged)
 """
 
 from config.messages.agent import AGENT_MESSAGES
-from config.messages.ui import UI_BUTTONS
+from config.messages.ui import UI_BUTTONS, CLEAN_JSON, ui_buttons_json
 from config.messages.search import CONVERSATION_RULES
 from config.messages.email import EMAIL_TEMPLATES, EMAIL_SUMMARY_PROMPT
 from config.messages.qualification import QUALIFICATION_QUESTIONS, FALLBACK_NOT_PROVIDED
@@ -5,7 +5,14 @@ Multi-language support via config.translations module.
 Used by: agents/email_agents.py, agents/main_agent.py
 """
 
-from config.translations import get_ui_buttons
+from functools import lru_cache
+
+from config.language import language_manager
+from config.translations import get_ui_buttons, UI_BUTTONS_TRANSLATIONS
+from utils import fastjson
+
+# Frontend "clean" signal — static, serialized once
+CLEAN_JSON = fastjson.dumps({"clean": True})
 
 
 def get_ui_buttons_config():
@@ -66,3 +73,17 @@ class UIButtonsDict(dict):
 
 
 UI_BUTTONS = UIButtonsDict()
+
+
+@lru_cache(maxsize=64)
+def _buttons_json(button_type: str, language: str) -> str:
+    translations = UI_BUTTONS_TRANSLATIONS.get(language, UI_BUTTONS_TRANSLATIONS["en"])
+    return fastjson.dumps(translations.get(button_type, {}))
+
+
+def ui_buttons_json(button_type: str) -> str:
+    """Serialized UI_BUTTONS[button_type] for the current language, ready for send_text.
+
+    Payloads are static per language, so each one is serialized only once.
+    """
+    return _buttons_json(button_type, language_manager.get_language())
@@ -27,6 +27,19 @@ BUDGET_ASK_BY_RESPONSE = 3      # Ask budget question at this response count
 
 HYBRID_SEARCH_ALPHA = 0.91      # Dense vs sparse weight (1.0 = pure dense, 0.0 = pure sparse)
 
+# =============================================================================
+# SEMANTIC CACHE — reuse results for repeated queries (per index)
+# =============================================================================
+
+SEMANTIC_CACHE_SIZE = 256         # Max cached queries per index (LRU)
+SEMANTIC_CACHE_TTL = 3600         # Seconds a cached result stays valid
+# Similarity tier is opt-in: short queries for different treatments ("laser hair
+# removal legs" / "... face") embed very close, so by default only the exact
+# normalized query text is served from cache
+SEMANTIC_CACHE_SIMILARITY = False
+SEMANTIC_CACHE_THRESHOLD = 0.985  # Min cosine similarity when the tier is enabled
+EMBEDDING_CACHE_SIZE = 512        # Query embeddings kept in memory (shared by both indexes)
+
 # =============================================================================
 # CONVERSATION LIMITS — control context window for search
 # =============================================================================
@@ -10,8 +10,11 @@ This module provides dynamic translations for:
 All content is automatically translated based on the current language setting.
 """
 
-from config.translations import get_services
+from functools import lru_cache
+
+from config.translations import get_services, SERVICES_TRANSLATIONS
 from config.language import language_manager
+from utils import fastjson
 
 # =============================================================================
 # SERVICES — dynamically loaded based on current language
@@ -70,6 +73,20 @@ class ServicesDict(dict):
 
 SERVICES = ServicesDict()
 
+
+@lru_cache(maxsize=64)
+def _services_json(key: str, language: str) -> str:
+    translations = SERVICES_TRANSLATIONS.get(language, SERVICES_TRANSLATIONS["en"])
+    return fastjson.dumps(translations[key])
+
+
+def services_json(key: str) -> str:
+    """Serialized SERVICES[key] for the current language, ready for send_text.
+
+    Button sets are static per language, so each one is serialized only once.
+    """
+    return _services_json(key, language_manager.get_language())
+
 # =============================================================================
 # REACHABILITY HELPERS
 # =============================================================================
@@ -137,18 +154,27 @@ REACHABILITY_KEY_MAPS = {
 
 
 # For backward compatibility: Derived reachability groups
-# These are now computed based on current language
-def get_reachability_phone_keys():
-    """Get phone-related reachability keys for current language."""
-    lang = language_manager.get_language()
+# These are now computed based on current language (memoized per language code;
+# frozensets so `reachability in keys` is a hash lookup)
+@lru_cache(maxsize=16)
+def _reachability_phone_keys(lang: str) -> frozenset:
     if lang == "de":
-        return ["telefon_heute", "whatsapp_heute"]
-    return ["phone_today", "whatsapp_today"]
+        return frozenset({"telefon_heute", "whatsapp_heute"})
+    return frozenset({"phone_today", "whatsapp_today"})
 
 
-def get_reachability_email_keys():
-    """Get email-related reachability keys for current language."""
-    lang = language_manager.get_language()
+@lru_cache(maxsize=16)
+def _reachability_email_keys(lang: str) -> frozenset:
     if lang == "de":
-        return ["email_woche"]
-    return ["email_week"]
+        return frozenset({"email_woche"})
+    return frozenset({"email_week"})
+
+
+def get_reachability_phone_keys() -> frozenset:
+    """Get phone-related reachability keys for current language."""
+    return _reachability_phone_keys(language_manager.get_language())
+
+
+def get_reachability_email_keys() -> frozenset:
+    """Get email-related reachability keys for current language."""
+    return _reachability_email_keys(language_manager.get_language())
@@ -19,6 +19,14 @@ EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
 # Realtime voice model (used by agents/base.py, agents/main_agent.py)
 RT_MODEL = "gpt-realtime-mini-2025-10-06"
 
+# Partial transcript streaming on the "message_delta" topic — off until the
+# frontend renders it (the full reply always goes out on "message"). When on,
+# new text is flushed every N chars or N seconds, whichever comes first, and
+# every reply ends with a {"done": true} packet, also when it was interrupted.
+TRANSCRIPT_STREAM_DELTAS = os.getenv("TRANSCRIPT_STREAM_DELTAS", "false").lower() == "true"
+TRANSCRIPT_DELTA_CHARS = 256
+TRANSCRIPT_DELTA_INTERVAL = 0.5
+
 # =============================================================================
 # 2. SMTP SETTINGS
 # =============================================================================
@@ -26,6 +34,9 @@ SMTP_CONFIG = {
     "host": "smtp.gmail.com",
     "port": 587,
     "timeout": 10,
+    "max_connections": 5,  # Concurrent SMTP connections per worker (provider limits: Gmail ~15)
+    "max_attempts": 4,     # Per-message attempts on transient failures
+    "retry_base": 0.25,    # Seconds; backoff = random(0, retry_base * 2**attempt)
 }
 
 # =============================================================================
@@ -53,9 +64,21 @@ WEBHOOK_URL = "https://ayand-log.vercel.app/api/webhooks/ingest"
 WEBHOOK_API_KEY = os.getenv("INGEST_API_KEY")
 WEBHOOK_TIMEOUT = 5                        # Seconds per attempt
 WEBHOOK_RETRIES = 3                        # Number of retry attempts
+WEBHOOK_MAX_CONNECTIONS = 4                # Pooled connections per worker (one job sends 1-2 webhooks)
+WEBHOOK_KEEPALIVE_EXPIRY = 60.0            # Seconds an idle pooled connection is kept open
 
 # =============================================================================
 # 7. FLASK STARTUP
 # =============================================================================
 FLASK_STARTUP_RETRIES = 20                 # Number of port-check attempts before warning
 FLASK_STARTUP_INTERVAL = 0.5              # Seconds between port-check attempts
+
+# =============================================================================
+# 8. EVENT LOOP
+# =============================================================================
+USE_UVLOOP = os.getenv("USE_UVLOOP", "false").lower() == "true"      # uvloop for job event loops (optional dependency)
+EAGER_TASKS = os.getenv("EAGER_TASKS", "false").lower() == "true"    # asyncio.eager_task_factory (Python 3.12+)
+
+# Per-session caps on background work started by agents/base.py spawn()
+SEND_TEXT_MAX_INFLIGHT = 8       # concurrent frontend send_text calls
+BACKGROUND_MAX_INFLIGHT = 16     # concurrent button/language handlers
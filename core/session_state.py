@@ -5,13 +5,15 @@ Shared across all agents via LiveKit's AgentSession.
 Not configuration — this is runtime state (contact info, search results, flow flags).
 """
 
+import asyncio
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict
 from livekit.agents import RunContext
 from config.settings import RT_MODEL  # noqa: F401 — re-exported for backward compat
+from config.settings import SEND_TEXT_MAX_INFLIGHT, BACKGROUND_MAX_INFLIGHT
 
 
-@dataclass
+@dataclass(slots=True)
 class UserData:
     # Contact info (collected naturally during conversation)
     name: Optional[str] = None
@@ -43,5 +45,51 @@ class UserData:
     conversation_summary: Optional[str] = None  # Agent-written summary via function tool
     _history_saved: bool = False
 
+    # (len(history.items), rendered tail) — fallback summary context, reused until history grows
+    _summary_cache: Optional[tuple] = field(default=None, repr=False, compare=False)
+
+    # Background email sends / history persistence. Session-scoped: the same set
+    # is handed to every conversation of the session (see next_conversation), so
+    # on_shutdown drains all of them before the webhook/SMTP clients close.
+    _background_tasks: set = field(default_factory=set, repr=False, compare=False)
+
+    # Tasks started by agents.base.spawn (task -> slot kind) and the semaphores
+    # that bound them. Session-scoped like _background_tasks: handoffs cancel
+    # the agent's own work, on_shutdown cancels the rest.
+    _spawned: dict = field(default_factory=dict, repr=False, compare=False)
+    _send_slots: asyncio.Semaphore = field(
+        default_factory=lambda: asyncio.Semaphore(SEND_TEXT_MAX_INFLIGHT), repr=False, compare=False
+    )
+    _task_slots: asyncio.Semaphore = field(
+        default_factory=lambda: asyncio.Semaphore(BACKGROUND_MAX_INFLIGHT), repr=False, compare=False
+    )
+
+    # Memoized str(self) — formatted into agent prompts on every handoff.
+    # Reset on any attribute assignment (in-place list mutation is not tracked).
+    _str_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def next_conversation(self) -> "UserData":
+        """Fresh state for a restarted conversation in the same session.
+
+        Conversation fields start over; session-scoped runtime state (task
+        sets and send/task slots) carries over so shutdown still sees it.
+        """
+        return UserData(
+            _background_tasks=self._background_tasks,
+            _spawned=self._spawned,
+            _send_slots=self._send_slots,
+            _task_slots=self._task_slots,
+        )
+
+    def __setattr__(self, name, value):
+        if name != "_str_cache":
+            object.__setattr__(self, "_str_cache", None)
+        object.__setattr__(self, name, value)
+
+    def __str__(self) -> str:
+        if self._str_cache is None:
+            object.__setattr__(self, "_str_cache", repr(self))
+        return self._str_cache
+
 
 RunContext_T = RunContext[UserData]
@@ -3,7 +3,7 @@ Main agent prompts — personality and greeting template.
 
 STATIC: Prompt structure (GOLDEN RULES, CONVERSATION PHASES, TOOL USAGE sections).
 CONFIGURABLE (via config/): agent name, personality, role, company name, product terms, rules.
-DYNAMIC: Language instruction is appended at runtime via get_language_instruction().
+DYNAMIC: Language instruction is appended at runtime via get_language_block().
 
 Used by: agents/main_agent.py (ConversationAgent)
 """
@@ -0,0 +1,82 @@
+"""
+Exact tier of utils/semantic_cache.SemanticCache — get/put, LRU, TTL, invalidate.
+
+Embeddings are opaque to the exact tier, so these use None and need no
+embedding model or index.
+"""
+
+import pytest
+
+from utils import semantic_cache
+from utils.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for TTL checks."""
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_put_then_get_exact_ignores_case_and_whitespace():
+    cache = SemanticCache(maxsize=4, ttl=60)
+    cache.put("Facial  Treatment", None, ["a"])
+
+    assert cache.get_exact("facial treatment") == ["a"]
+    assert cache.get_exact("  FACIAL treatment ") == ["a"]
+    assert cache.get_exact("massage") is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_put_replaces_existing_entry():
+    cache = SemanticCache(maxsize=4, ttl=60)
+    cache.put("lips", None, ["old"])
+    cache.put("Lips", None, ["new"])
+
+    assert cache.get_exact("lips") == ["new"]
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SemanticCache(maxsize=2, ttl=60)
+    cache.put("a", None, 1)
+    cache.put("b", None, 2)
+    cache.get_exact("a")  # "b" is now the oldest
+    cache.put("c", None, 3)
+
+    assert cache.get_exact("b") is None
+    assert cache.get_exact("a") == 1
+    assert cache.get_exact("c") == 3
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = SemanticCache(maxsize=4, ttl=60)
+    cache.put("brows", None, ["x"])
+
+    clock[0] += 60
+    assert cache.get_exact("brows") == ["x"]
+    clock[0] += 1
+    assert cache.get_exact("brows") is None
+    # Expired entries are dropped, not just skipped
+    clock[0] -= 61
+    assert cache.get_exact("brows") is None
+
+
+def test_invalidate_one_query_or_all():
+    cache = SemanticCache(maxsize=4, ttl=60)
+    cache.put("a", None, 1)
+    cache.put("b", None, 2)
+
+    cache.invalidate(" A ")
+    assert cache.get_exact("a") is None
+    assert cache.get_exact("b") == 2
+
+    cache.invalidate()
+    assert cache.get_exact("b") is None
+
+
+def test_similarity_tier_off_without_threshold():
+    cache = SemanticCache(maxsize=4, ttl=60)
+    cache.put("a", None, 1)
+
+    assert cache.get(None) is None
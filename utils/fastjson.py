@@ -0,0 +1,29 @@
+"""
+Fast JSON helpers — orjson-backed encode/decode for frontend payloads.
+
+send_text() takes a str, so dumps() returns str. loads() accepts bytes or
+str, so inbound data packets are parsed without a separate UTF-8 decode.
+
+Used by: agents/base.py, agents/main_agent.py, config/messages/ui.py,
+         config/services.py, utils/history.py, utils/search_pipeline.py,
+         utils/webhook.py
+"""
+
+import orjson
+
+JSONDecodeError = orjson.JSONDecodeError
+loads = orjson.loads
+
+
+def dumps(obj) -> str:
+    """Serialize obj to a compact JSON string (UTF-8, non-ASCII kept as-is)."""
+    return orjson.dumps(obj).decode()
+
+
+def dumps_bytes(obj) -> bytes:
+    """Serialize obj to JSON bytes — for HTTP request bodies (no str round-trip).
+
+    numpy arrays are written natively; a float32 array uses the shortest
+    float32 repr, roughly half the bytes of the same vector as Python floats.
+    """
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
@@ -3,7 +3,6 @@
 
 import json
 import os
-import re
 import time
 import logging
 from typing import Dict, Any
@@ -12,6 +11,7 @@ from dotenv import load_dotenv
 from prompt.static_extraction import SINGLE_EXTRACTION_PROMPT
 from config.company import COMPANY
 from config.settings import LLM_MODEL, LLM_TEMPERATURE, OPENROUTER_BASE_URL
+from utils.regex_registry import is_valid_email
 import pytz
 from datetime import datetime 
 
@@ -28,13 +28,7 @@ llm = ChatOpenAI(
 
 
 def is_valid_email_syntax(s: str) -> bool:
-    EMAIL_RE = re.compile(
-                r"^(?=.{1,254}$)(?=.{1,64}@)"
-                r"[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+"
-                r"@"
-                r"(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}$"
-            )
-    return EMAIL_RE.match(s) is not None
+    return is_valid_email(s)
 
 
 def extract_filters_direct(current_message: str, current_preferences: Dict) -> Dict:
@@ -28,7 +28,7 @@ from config.classification import (
 # FILTER VALIDATION RESULT
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class FilterValidationResult:
     """Result of filter validation with transparency about what was dropped."""
     valid_filters: Dict[str, Any]
@@ -40,7 +40,7 @@ class FilterValidationResult:
 # USER PREFERENCES STATE — Config-driven, domain-independent
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class UserPreferences:
     """
     Config-driven filter state. Categorical and numeric fields stored in dicts,
@@ -4,20 +4,14 @@ Small utility functions — email validation, time-based greeting.
 Extracted from filter_extraction.py (which is being deleted).
 """
 
-import re
 import pytz
 from datetime import datetime
 from config.company import COMPANY
+from utils.regex_registry import is_valid_email, normalize_email  # noqa: F401 (re-export)
 
 
 def is_valid_email_syntax(s: str) -> bool:
-    EMAIL_RE = re.compile(
-        r"^(?=.{1,254}$)(?=.{1,64}@)"
-        r"[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+"
-        r"@"
-        r"(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}$"
-    )
-    return EMAIL_RE.match(s) is not None
+    return is_valid_email(s)
 
 
 def get_greeting():
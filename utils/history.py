@@ -4,12 +4,12 @@ Conversation history — save transcripts to local text files.
 Webhook sending has moved to utils/webhook.py.
 """
 
-import json
 import os
 import logging
 from datetime import datetime
 from config.settings import SAVE_CONVERSATION_HISTORY
 from config.messages import HISTORY_FORMAT
+from utils import fastjson
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +19,12 @@ HISTORY_DIR = os.path.join(
 )
 
 
+class NormalizedMessages(tuple):
+    """Immutable result of normalize_messages(). Passing it back in returns it
+    unchanged, so a history normalized once costs nothing for later consumers."""
+    __slots__ = ()
+
+
 def normalize_messages(chat_messages):
     """
     Converts ChatMessage objects into a standardized dictionary format:
@@ -27,38 +33,65 @@ def normalize_messages(chat_messages):
     - User messages containing JSON strings will be parsed.
     - Assistant messages are flattened into a single string.
     - Skips non-ChatMessage items like FunctionCall.
+    - Already-normalized {role, message} dicts pass through unchanged.
+    - A NormalizedMessages result is returned as-is (no walk at all), so a
+      caller can normalize once and hand the result to several consumers.
     """
-    normalized = []
+    if isinstance(chat_messages, NormalizedMessages):
+        return chat_messages
 
+    normalized = []
     for msg in chat_messages:
-        # Skip if not a ChatMessage (e.g., FunctionCall)
-        if not hasattr(msg, 'role'):
-            continue
-
-        role = msg.role
-
-        # Extract raw content (list of strings)
-        if isinstance(msg.content, list) and msg.content:
-            raw = " ".join(msg.content)
-        else:
-            raw = str(msg.content)
-
-        # If user message contains a JSON string, parse it
-        if role == "user":
-            try:
-                parsed = json.loads(raw)
-                message_text = parsed.get("message", raw)
-            except Exception:
-                message_text = raw
-        else:
-            message_text = raw
-
-        normalized.append({
-            "role": role,
-            "message": message_text
-        })
-
-    return normalized
+        entry = _normalize_one(msg)
+        if entry is not None:
+            normalized.append(entry)
+
+    return NormalizedMessages(normalized)
+
+
+def last_message(chat_messages):
+    """
+    Normalized form of the newest chat message, or None if there is none.
+
+    Walks from the end and stops at the first ChatMessage, so the cost does
+    not grow with conversation length (FunctionCall items are skipped).
+    """
+    for msg in reversed(chat_messages):
+        entry = _normalize_one(msg)
+        if entry is not None:
+            return entry
+    return None
+
+
+def _normalize_one(msg):
+    """Single item -> {role, message}, or None for non-message items."""
+    if isinstance(msg, dict) and "role" in msg and "message" in msg:
+        return msg
+
+    # Skip if not a ChatMessage (e.g., FunctionCall)
+    if not hasattr(msg, 'role'):
+        return None
+
+    role = msg.role
+
+    # Extract raw content (list of strings)
+    if isinstance(msg.content, list) and msg.content:
+        raw = " ".join(msg.content)
+    else:
+        raw = str(msg.content)
+
+    # If user message contains a JSON object, parse it (plain speech skips the parser)
+    message_text = raw
+    if role == "user" and raw.lstrip().startswith("{"):
+        try:
+            message_text = fastjson.loads(raw).get("message", raw)
+        except Exception:
+            pass
+
+    return {
+        "role": role,
+        "message": message_text
+    }
 
 
 def save_conversation_to_file(chat_messages, userdata, start_time=None):
@@ -27,7 +27,7 @@ class MessageCategory(Enum):
     GRATITUDE = "gratitude"
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassificationResult:
     """Result of message classification."""
     category: MessageCategory
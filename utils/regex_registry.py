@@ -0,0 +1,54 @@
+"""
+Regex registry — precompiled patterns shared by the contact pipeline.
+
+Compiled once at import so hot paths (email validation on every contact
+tool call, transcript scan on shutdown) never recompile a pattern. Patterns
+run on raw user text, so google-re2 (linear-time, no backtracking) is used
+when installed; stdlib re is the fallback.
+
+Used by: agent.py, utils/helpers.py, utils/filter_extraction.py
+         (normalize_email via utils/helpers.py: agents/main_agent.py,
+         agents/email_agents.py, agents/contact_agents.py)
+"""
+
+import re
+from typing import Optional
+
+try:
+    import re2
+except ImportError:  # optional dependency
+    re2 = None
+
+
+def _compile(pattern: str):
+    """Compile with RE2 if available, else stdlib re (ASCII-only classes)."""
+    if re2 is not None:
+        return re2.compile(pattern)
+    return re.compile(pattern, re.ASCII)
+
+
+# Email address shape. RE2 has no lookaheads, so the length limits live in
+# is_valid_email() instead of the pattern.
+EMAIL = _compile(
+    r"^[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+"
+    r"@"
+    r"(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}$"
+)
+
+# Email address anywhere inside free text (transcript safety net)
+EMAIL_SCAN = _compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
+
+def is_valid_email(s: str) -> bool:
+    """Full-string email validation (max 254 chars total, 64 in the local part)."""
+    return len(s) <= 254 and 0 < s.find("@") <= 64 and EMAIL.match(s) is not None
+
+
+def normalize_email(s: str) -> Optional[str]:
+    """Trimmed, lower-cased address if s holds a valid email, else None.
+
+    Lower-casing first is safe — EMAIL accepts both cases — so callers get the
+    stored form and the validity check from one strip + lower.
+    """
+    s = s.strip().lower()
+    return s if is_valid_email(s) else None
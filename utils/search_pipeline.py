@@ -1,8 +1,13 @@
 import os
 import sys
+import asyncio
 import logging
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import cache
 
 # Ensure project root is in sys.path (needed when run as subprocess)
 _project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,14 +16,29 @@ if _project_root not in sys.path:
 
 from pinecone import Pinecone, ServerlessSpec
 import numpy as np
-from typing import List, Dict
-from openai import OpenAI
+import httpx
+from typing import List, Dict, Optional
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
 import joblib
-from config.search import HYBRID_SEARCH_ALPHA
+from config.search import (
+    EMBEDDING_CACHE_SIZE,
+    HYBRID_SEARCH_ALPHA,
+    SEMANTIC_CACHE_SIMILARITY,
+    SEMANTIC_CACHE_SIZE,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+)
+from utils import fastjson
+from utils.semantic_cache import SemanticCache
 
 load_dotenv()
 
+# Data-plane REST version for the async query path (POST https://{host}/query)
+PINECONE_API_VERSION = "2025-04"
+ASYNC_MAX_CONNECTIONS = 8
+
+
 class SearchPipeline:
     """
     Dual-index search pipeline for Beauty Lounge.
@@ -34,9 +54,22 @@ class SearchPipeline:
         self._load_config()
         self._initialize_pinecone()
         self._initialize_embedding_model()
+        # Same text -> same embedding: shared by both indexes, featured queries
+        # and the sync/async paths
+        self._embeddings: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._embeddings_lock = threading.Lock()
+        # Async clients — created on first use inside the job's event loop
+        self._http: Optional[httpx.AsyncClient] = None
+        self._async_openai: Optional[AsyncOpenAI] = None
         self.service_vectorizer = joblib.load('tfidf_vectorizer_service.joblib')
         self.product_vectorizer = joblib.load('tfidf_vectorizer.joblib')
         self.current_date = datetime.now().strftime("%B %d, %Y")
+        # One cache per index (category); the fixed showcase queries get their own
+        # exact-only cache so user searches can never be served showcase results
+        threshold = SEMANTIC_CACHE_THRESHOLD if SEMANTIC_CACHE_SIMILARITY else None
+        self.service_cache = SemanticCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TTL, threshold)
+        self.product_cache = SemanticCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TTL, threshold)
+        self.featured_cache = SemanticCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TTL)
 
     def _setup_logging(self):
         logging.basicConfig(
@@ -77,10 +110,12 @@ class SearchPipeline:
 
                 # Initialize service index
                 self.service_index = self._get_or_create_index(pc, self.service_index_name)
+                self.service_host = pc.describe_index(self.service_index_name).host
                 self.logger.info(f"Connected to SERVICE index: {self.service_index_name}")
 
                 # Initialize product index
                 self.product_index = self._get_or_create_index(pc, self.product_index_name)
+                self.product_host = pc.describe_index(self.product_index_name).host
                 self.logger.info(f"Connected to PRODUCT index: {self.product_index_name}")
 
                 return
@@ -134,17 +169,68 @@ class SearchPipeline:
             self.logger.error(f"Failed to load embedding model: {e}")
             raise
 
+    def _cached_embedding(self, query: str) -> Optional[np.ndarray]:
+        with self._embeddings_lock:
+            emb = self._embeddings.get(query)
+            if emb is not None:
+                self._embeddings.move_to_end(query)
+            return emb
+
+    def _store_embedding(self, query: str, emb: np.ndarray) -> np.ndarray:
+        emb.setflags(write=False)  # shared via the cache — must not be mutated
+        with self._embeddings_lock:
+            self._embeddings[query] = emb
+            if len(self._embeddings) > EMBEDDING_CACHE_SIZE:
+                self._embeddings.popitem(last=False)
+        return emb
+
+    def _embed(self, query: str) -> np.ndarray:
+        emb = self._cached_embedding(query)
+        if emb is None:
+            emb = self._store_embedding(query, self.embedding_model.encode([query])[0])
+        return emb
+
+    def _embed_many(self, queries: List[str]) -> None:
+        """Embed every uncached query in one OpenAI request and cache the rows,
+        so the per-query searches that follow skip their embedding round-trip."""
+        missing = [q for q in dict.fromkeys(queries) if self._cached_embedding(q) is None]
+        if missing:
+            for query, emb in zip(missing, self.embedding_model.encode(missing)):
+                self._store_embedding(query, emb)
+
+    async def _embed_async(self, query: str) -> np.ndarray:
+        emb = self._cached_embedding(query)
+        if emb is not None:
+            return emb
+        if self._async_openai is None:
+            self._async_openai = AsyncOpenAI(api_key=self.openai_api_key)
+        for attempt in range(3):
+            try:
+                response = await self._async_openai.embeddings.create(
+                    input=[query], model=self.embedding_model_name
+                )
+                break
+            except Exception:
+                if attempt == 2:
+                    raise
+                await asyncio.sleep(1 * (attempt + 1))
+        emb = np.asarray(response.data[0].embedding)
+        return self._store_embedding(query, emb / np.linalg.norm(emb))
+
+    @staticmethod
+    def _sparse_vector(query: str, tfidf) -> Dict[str, List]:
+        sparse_embedding = tfidf.transform([query])[0]
+        return {"indices": sparse_embedding.indices.tolist(), "values": sparse_embedding.data.tolist()}
+
     def process_query(self, query: str, vectorizer=None) -> tuple:
         self.logger.info("Step 4: Processing query...")
         start_time = time.time()
         try:
-            query_emb = self.embedding_model.encode([query])[0]
+            query_emb = self._embed(query)
             # Use provided vectorizer or default to product vectorizer for backward compatibility
             tfidf = vectorizer if vectorizer else self.product_vectorizer
-            sparse_embedding = tfidf.transform([query])[0]
-            indices = sparse_embedding.indices.tolist()
-            values = sparse_embedding.data.tolist()
-            sparse_vec = {"indices": indices, "values": values}
+            sparse_vec = self._sparse_vector(query, tfidf)
+            indices, values = sparse_vec["indices"], sparse_vec["values"]
             self.logger.info(f"Query: {query}")
             self.logger.info(f"Dense embedding shape: {query_emb.shape}, first 5 values: {query_emb[:5]}")
             self.logger.info(f"Sparse vector: indices={indices[:5]}..., values={values[:5]}...")
@@ -197,6 +283,98 @@ class SearchPipeline:
             self.logger.error(f"Retrieval failed: {e}")
             raise
 
+    def _similar_hit(self, query: str, cache: SemanticCache, query_emb: np.ndarray, top_k: int):
+        """Similarity-tier hit with at least top_k results, logged with its score."""
+        similar = cache.get(query_emb)
+        if similar is None or similar[0][0] < top_k:
+            return None
+        self.logger.info(
+            f"Semantic cache hit: {query} (score={similar[1]:.4f}, hits={cache.hits}, misses={cache.misses})"
+        )
+        return similar[0]
+
+    def _cached_search(self, query: str, index, vectorizer, cache: SemanticCache, top_k: int) -> List[Dict]:
+        """Retrieve via the semantic cache — exact text hit skips the embedding call,
+        similar-embedding hit (if enabled) skips Pinecone. Returns copies (callers tag items)."""
+        hit = cache.get_exact(query)
+        if hit is None or hit[0] < top_k:
+            query_emb, sparse_vec = self.process_query(query, vectorizer=vectorizer)
+            hit = self._similar_hit(query, cache, query_emb, top_k)
+            if hit is None:
+                retrieved = self._retrieve(index, query_emb, sparse_vec, top_k=top_k, alpha=HYBRID_SEARCH_ALPHA)
+                hit = (top_k, [item["metadata"] for item in retrieved])
+                cache.put(query, query_emb, hit)
+        else:
+            self.logger.info(f"Exact cache hit: {query} (hits={cache.hits}, misses={cache.misses})")
+        return [dict(item) for item in hit[1][:top_k]]
+
+    async def _query_async(self, host: str, dense_emb: np.ndarray, sparse_vec: Dict, top_k: int) -> List[Dict]:
+        """Pinecone query over the REST data plane — same request _retrieve makes
+        through the sync SDK, without a worker thread.
+
+        The dense vector goes out as float32 — the precision Pinecone stores —
+        and is serialized straight from the array by orjson, which roughly
+        halves the request body versus a list of float64 reprs.
+        """
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0),
+                limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS),
+                headers={
+                    "Api-Key": self.pinecone_api_key,
+                    "X-Pinecone-API-Version": PINECONE_API_VERSION,
+                },
+            )
+        hdense = (dense_emb * HYBRID_SEARCH_ALPHA).astype(np.float32)
+        body = {"vector": hdense, "topK": top_k, "includeMetadata": True}
+        if sparse_vec["values"]:
+            body["sparseVector"] = {
+                "indices": sparse_vec["indices"],
+                "values": [v * (1 - HYBRID_SEARCH_ALPHA) for v in sparse_vec["values"]],
+            }
+        response = await self._http.post(
+            f"https://{host}/query",
+            content=fastjson.dumps_bytes(body),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+        return fastjson.loads(response.content).get("matches", [])
+
+    async def _cached_search_async(self, query: str, host: str, vectorizer, cache: SemanticCache, top_k: int) -> List[Dict]:
+        """Async twin of _cached_search — same cache tiers, native async I/O."""
+        hit = cache.get_exact(query)
+        if hit is None or hit[0] < top_k:
+            query_emb = await self._embed_async(query)
+            hit = self._similar_hit(query, cache, query_emb, top_k)
+            if hit is None:
+                start_time = time.time()
+                matches = await self._query_async(host, query_emb, self._sparse_vector(query, vectorizer), top_k)
+                self.logger.info(f"Async retrieval: {len(matches)} items in {time.time() - start_time:.2f} seconds")
+                hit = (top_k, [match.get("metadata", {}) for match in matches])
+                cache.put(query, query_emb, hit)
+        else:
+            self.logger.info(f"Exact cache hit: {query} (hits={cache.hits}, misses={cache.misses})")
+        return [dict(item) for item in hit[1][:top_k]]
+
+    async def search_services_async(self, query: str, top_k: int = 5) -> List[Dict]:
+        """search_services without a worker thread (async OpenAI + Pinecone REST)."""
+        self.logger.info(f"Searching SERVICES (async): {query}")
+        return await self._cached_search_async(query, self.service_host, self.service_vectorizer, self.service_cache, top_k)
+
+    async def search_products_async(self, query: str, top_k: int = 5) -> List[Dict]:
+        """search_products without a worker thread (async OpenAI + Pinecone REST)."""
+        self.logger.info(f"Searching PRODUCTS (async): {query}")
+        return await self._cached_search_async(query, self.product_host, self.product_vectorizer, self.product_cache, top_k)
+
+    async def aclose(self) -> None:
+        """Close the async clients (the sync SDK clients need no teardown)."""
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
+        if self._async_openai is not None:
+            await self._async_openai.close()
+        self._async_openai = None
+
     def search_services(self, query: str, top_k: int = 5) -> List[Dict]:
         """
         Search beauty SERVICES (treatments, permanent makeup, wellness).
@@ -210,9 +388,7 @@ class SearchPipeline:
             List of service metadata dicts
         """
         self.logger.info(f"Searching SERVICES: {query}")
-        query_emb, sparse_vec = self.process_query(query, vectorizer=self.service_vectorizer)
-        retrieved = self._retrieve(self.service_index, query_emb, sparse_vec, top_k=top_k, alpha=HYBRID_SEARCH_ALPHA)
-        return [item["metadata"] for item in retrieved]
+        return self._cached_search(query, self.service_index, self.service_vectorizer, self.service_cache, top_k)
 
     def search_products(self, query: str, top_k: int = 5) -> List[Dict]:
         """
@@ -227,9 +403,7 @@ class SearchPipeline:
             List of product metadata dicts
         """
         self.logger.info(f"Searching PRODUCTS: {query}")
-        query_emb, sparse_vec = self.process_query(query, vectorizer=self.product_vectorizer)
-        retrieved = self._retrieve(self.product_index, query_emb, sparse_vec, top_k=top_k, alpha=HYBRID_SEARCH_ALPHA)
-        return [item["metadata"] for item in retrieved]
+        return self._cached_search(query, self.product_index, self.product_vectorizer, self.product_cache, top_k)
 
     def run(self, query: str, top_k: int = 5) -> List[Dict]:
         """
@@ -257,37 +431,38 @@ class SearchPipeline:
         Returns:
             List of service metadata dicts with category field included
         """
-        featured = []
-
-        # Query facial/body treatments (semantic search already returns relevant results)
-        try:
-            treatments = self.search_services("Gesichtsbehandlung Kosmetik Pflege", top_k=treatments_count)
-            for item in treatments[:treatments_count]:
-                item["category"] = "treatments"
-                featured.append(item)
-            self.logger.info(f"Featured treatments: {len(treatments[:treatments_count])} items")
-        except Exception as e:
-            self.logger.error(f"Failed to get featured treatments: {e}")
-
-        # Query permanent makeup
+        # One batched embedding request for all three category queries, then the
+        # Pinecone round-trips side by side (Pinecone takes one vector per
+        # query); output keeps the group order.
+        groups = (
+            ("treatments", "Gesichtsbehandlung Kosmetik Pflege", treatments_count),
+            ("permanent_makeup", "Permanent Make-Up Augenbrauen Lippen", pmu_count),
+            ("wellness", "Massage Wellness Entspannung", wellness_count),
+        )
         try:
-            pmu = self.search_services("Permanent Make-Up Augenbrauen Lippen", top_k=pmu_count)
-            for item in pmu[:pmu_count]:
-                item["category"] = "permanent_makeup"
-                featured.append(item)
-            self.logger.info(f"Featured PMU: {len(pmu[:pmu_count])} items")
+            self._embed_many([query for _, query, _ in groups])
         except Exception as e:
-            self.logger.error(f"Failed to get featured PMU: {e}")
+            self.logger.warning(f"Batched featured embedding failed, embedding per query: {e}")
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            futures = [
+                pool.submit(
+                    self._cached_search, query, self.service_index,
+                    self.service_vectorizer, self.featured_cache, count,
+                )
+                for _, query, count in groups
+            ]
 
-        # Query wellness/massage
-        try:
-            wellness = self.search_services("Massage Wellness Entspannung", top_k=wellness_count)
-            for item in wellness[:wellness_count]:
-                item["category"] = "wellness"
+        featured = []
+        for (category, _, count), future in zip(groups, futures):
+            try:
+                items = future.result()[:count]
+            except Exception as e:
+                self.logger.error(f"Failed to get featured {category}: {e}")
+                continue
+            for item in items:
+                item["category"] = category
                 featured.append(item)
-            self.logger.info(f"Featured wellness: {len(wellness[:wellness_count])} items")
-        except Exception as e:
-            self.logger.error(f"Failed to get featured wellness: {e}")
+            self.logger.info(f"Featured {category}: {len(items)} items")
 
         self.logger.info(f"Total featured services: {len(featured)}")
         return featured
@@ -299,6 +474,20 @@ class SearchPipeline:
 # Backward compatibility alias for class name
 ProductSearchPipeline = SearchPipeline
 
+
+@cache
+def get_search_pipeline() -> SearchPipeline:
+    """Process-wide pipeline: Pinecone connections, the OpenAI client and both
+    TF-IDF vectorizers are set up once instead of per agent instance.
+    A failed init is not cached, so the next caller retries."""
+    return SearchPipeline()
+
+
+async def close_search_clients() -> None:
+    """Close the shared pipeline's async clients, if it was ever built."""
+    if get_search_pipeline.cache_info().currsize:
+        await get_search_pipeline().aclose()
+
 if __name__ == "__main__":
     from flask import Flask, request, jsonify
     from config.search import FLASK_PORT
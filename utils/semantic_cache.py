@@ -0,0 +1,92 @@
+"""
+Semantic search cache — reuse recent Pinecone results for repeated queries.
+
+Lookup is two-tier: exact normalized text (case/whitespace-insensitive; skips
+the embedding call too), then — only if a threshold is given — cosine
+similarity over the cached embeddings. The similarity tier is off unless
+configured: short queries for different treatments embed close enough to
+cross loose thresholds. Embeddings from SearchPipeline are already
+L2-normalized, so cosine is a dot.
+
+Thread-safe — searches run in asyncio.to_thread workers. Hit/miss counters
+are kept for logging; a miss is counted when a fresh result is stored.
+
+Used by: utils/search_pipeline.py
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class SemanticCache:
+    """In-process LRU of (normalized query -> embedding, value, timestamp)."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600.0, threshold: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries: OrderedDict[str, tuple[np.ndarray, Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_exact(self, text: str) -> Optional[Any]:
+        """Value cached for this exact query text (case/whitespace-insensitive)."""
+        key = _normalize(text)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if now - entry[2] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get(self, embedding: np.ndarray) -> Optional[tuple[Any, float]]:
+        """(value, cosine score) of the most similar live entry at or above the
+        threshold; always None when the similarity tier is disabled."""
+        if self.threshold is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            best_key, best_score = None, self.threshold
+            for key, (emb, _, ts) in list(self._entries.items()):
+                if now - ts > self.ttl:
+                    del self._entries[key]
+                    continue
+                score = float(np.dot(emb, embedding))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return self._entries[best_key][1], best_score
+
+    def put(self, text: str, embedding: np.ndarray, value: Any) -> None:
+        key = _normalize(text)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (embedding, value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, text: Optional[str] = None) -> None:
+        """Drop one query's entry, or everything (e.g. after re-indexing)."""
+        with self._lock:
+            if text is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(_normalize(text), None)
@@ -1,8 +1,12 @@
 import os
+import re
 import time
+import random
 import logging
 import dotenv
 import ssl
+import socket
+from functools import lru_cache
 from email.message import EmailMessage
 import smtplib
 from langchain_openai import ChatOpenAI
@@ -28,28 +32,184 @@ llm = ChatOpenAI(
 )
 
 
-def _send_via_smtp(em: EmailMessage, recipient: str, retries: int = 3) -> bool:
-    """Send an email via SMTP with retry. Returns True on success."""
-    context = ssl.create_default_context()
-    for attempt in range(retries):
-        try:
-            with smtplib.SMTP(SMTP_CONFIG["host"], SMTP_CONFIG["port"], timeout=SMTP_CONFIG["timeout"]) as smtp:
-                smtp.ehlo()
-                smtp.starttls(context=context)
-                smtp.ehlo()
-                smtp.login(email_sender, email_password)
-                smtp.sendmail(email_sender, recipient, em.as_string())
-            return True
-        except Exception as e:
-            logger.warning(f"SMTP attempt {attempt + 1}/{retries} failed: {e}")
-            if attempt < retries - 1:
-                time.sleep(1 * (attempt + 1))
+_SSL_CONTEXT = ssl.create_default_context()
+
+# Transient SMTP replies are the 4xx class (service unavailable, mailbox busy,
+# local error, insufficient storage, TLS temporarily unavailable, throttling);
+# 5xx — including 554 rejected/policy — is permanent and never retried
+def _is_transient_code(code: int) -> bool:
+    return 400 <= code < 500
+
+# Failures that will hit every message the same way (bad credentials, DNS,
+# server refusing connections) — a session stops sending after the first one
+_FATAL_SMTP_ERRORS = (smtplib.SMTPAuthenticationError, socket.gaierror, ConnectionRefusedError)
+
+_BARE_EOL = re.compile(r"\r\n|\n|\r(?!\n)")
+_LEADING_DOT = re.compile(rb"(?m)^\.")
+
+
+class _PipeliningSMTP(smtplib.SMTP):
+    """smtplib.SMTP that sends MAIL FROM / RCPT TO / DATA in a single write when
+    the server advertises PIPELINING (RFC 2920), then reads the replies in order.
+
+    Saves one round-trip per command. Falls back to stock sendmail otherwise.
+    """
+
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+        if mail_options or rcpt_options or not self.has_extn("pipelining"):
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        if isinstance(msg, str):
+            msg = _BARE_EOL.sub(smtplib.CRLF, msg).encode("ascii")
+
+        mail_cmd = f"mail FROM:{smtplib.quoteaddr(from_addr)}"
+        if self.has_extn("size"):
+            mail_cmd += f" size={len(msg)}"
+        cmds = [mail_cmd, *(f"rcpt TO:{smtplib.quoteaddr(r)}" for r in to_addrs), "data"]
+        self.send("".join(f"{cmd}{smtplib.CRLF}" for cmd in cmds))
+        replies = [self.getreply() for _ in cmds]
+
+        (mail_code, mail_resp), (data_code, data_resp) = replies[0], replies[-1]
+        refused = {
+            rcpt: reply
+            for rcpt, reply in zip(to_addrs, replies[1:-1])
+            if reply[0] not in (250, 251)
+        }
+        if mail_code != 250 or len(refused) == len(to_addrs) or data_code != 354:
+            if data_code == 354 or mail_code == 421:
+                # Server is waiting for a body we won't send — drop the connection
+                self.close()
+            else:
+                self._rset()
+            if mail_code != 250:
+                raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+            if len(refused) == len(to_addrs):
+                raise smtplib.SMTPRecipientsRefused(refused)
+            raise smtplib.SMTPDataError(data_code, data_resp)
+
+        body = _LEADING_DOT.sub(b"..", msg)
+        if not body.endswith(b"\r\n"):
+            body += b"\r\n"
+        self.send(body + b".\r\n")
+        code, resp = self.getreply()
+        if code != 250:
+            if code == 421:
+                self.close()
+            else:
+                self._rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+
+class SMTPSession:
+    """One authenticated SMTP connection reused for several messages.
+
+    Blocking — run inside asyncio.to_thread:
+
+        with SMTPSession() as smtp:
+            send_email(..., smtp=smtp)
+            send_lead_notification(..., smtp=smtp)
+
+    The connection (EHLO/STARTTLS/AUTH) is opened on the first send and
+    re-opened only if a send fails. After an auth/DNS/refused-connection
+    failure the session is marked unusable and later sends return False
+    immediately instead of paying the connect cost again.
+    """
 
-    logger.error(f"SMTP send to {recipient} failed after {retries} attempts")
-    return False
+    def __init__(self, max_attempts: int | None = None):
+        self._max_attempts = max_attempts or SMTP_CONFIG["max_attempts"]
+        self._smtp: _PipeliningSMTP | None = None
+        self.failed: Exception | None = None
 
+    def __enter__(self) -> "SMTPSession":
+        return self
 
-def send_email(recipient: str, formatted_date: str, formatted_time: str, products) -> bool:
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _connect(self) -> _PipeliningSMTP:
+        smtp = _PipeliningSMTP(SMTP_CONFIG["host"], SMTP_CONFIG["port"], timeout=SMTP_CONFIG["timeout"])
+        try:
+            smtp.ehlo()
+            smtp.starttls(context=_SSL_CONTEXT)
+            smtp.ehlo()
+            smtp.login(email_sender, email_password)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    def close(self) -> None:
+        """Close the connection (if open). Safe to call repeatedly."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    def send(self, em: EmailMessage, recipient: str) -> bool:
+        """Send an email, retrying transient failures with full-jitter backoff and
+        reconnecting after each failure. Returns True on success."""
+        if self.failed is not None:
+            logger.error(f"SMTP send to {recipient} skipped — server unusable: {self.failed}")
+            return False
+
+        attempts = self._max_attempts
+        for attempt in range(attempts):
+            try:
+                if self._smtp is None:
+                    self._smtp = self._connect()
+                self._smtp.sendmail(email_sender, recipient, em.as_string())
+                return True
+            except Exception as e:
+                self.close()
+                if isinstance(e, _FATAL_SMTP_ERRORS):
+                    self.failed = e
+                    logger.error(f"SMTP send to {recipient} failed, server unusable: {e}")
+                    return False
+                if not _is_retryable(e):
+                    logger.error(f"SMTP send to {recipient} failed permanently: {e}")
+                    return False
+                logger.warning(f"SMTP attempt {attempt + 1}/{attempts} failed: {e}")
+                if attempt < attempts - 1:
+                    time.sleep(random.uniform(0, SMTP_CONFIG["retry_base"] * 2 ** attempt))
+
+        logger.error(f"SMTP send to {recipient} failed after {attempts} attempts")
+        return False
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """4xx replies, dropped/failed connections and socket errors/timeouts are
+    retryable. Permanent rejections (5xx, e.g. 550, 554, 535 auth failure) and
+    anything else — programming errors such as ValueError or
+    UnicodeEncodeError — fail on the first attempt."""
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(_is_transient_code(code) for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return _is_transient_code(exc.smtp_code)
+    if isinstance(exc, smtplib.SMTPException):
+        return False  # SMTPException subclasses OSError — other SMTP errors are not transient
+    return isinstance(exc, OSError)  # socket errors; TimeoutError is an OSError
+
+
+def _send_via_smtp(em: EmailMessage, recipient: str, smtp: SMTPSession | None = None) -> bool:
+    """Send on the given SMTPSession, or on a one-off connection. Returns True on success."""
+    if smtp is not None:
+        return smtp.send(em, recipient)
+    with SMTPSession() as one_off:
+        return one_off.send(em, recipient)
+
+
+def send_email(
+    recipient: str, formatted_date: str, formatted_time: str, products, smtp: SMTPSession | None = None
+) -> bool:
     """Send appointment confirmation email to customer."""
     subject = EMAIL_TEMPLATES["appointment_subject"].format(
         date=formatted_date or "TBD", time=formatted_time or "TBD",
@@ -74,10 +234,29 @@ def send_email(recipient: str, formatted_date: str, formatted_time: str, product
     em['to'] = recipient
     em.set_content(body)
 
-    return _send_via_smtp(em, recipient)
+    return _send_via_smtp(em, recipient, smtp)
+
+
+@lru_cache(maxsize=32)
+def _llm_summary(summary_prompt: str) -> str:
+    """LLM-written summary for a prompt, with retry. Raises RuntimeError on failure.
+
+    Memoized (failures are not cached), so re-sending the same conversation,
+    e.g. to a corrected address, doesn't run another completion.
+    """
+    for attempt in range(3):
+        try:
+            return llm.invoke(summary_prompt).content.strip()
+        except Exception as e:
+            logger.warning(f"Summary LLM attempt {attempt + 1}/3 failed: {e}")
+            if attempt < 2:
+                time.sleep(1 * (attempt + 1))
+    raise RuntimeError("Summary LLM failed after 3 attempts")
 
 
-def send_email_summary(recipient: str, summary_context, language: str = None) -> bool:
+def send_email_summary(
+    recipient: str, summary_context, language: str = None, smtp: SMTPSession | None = None
+) -> bool:
     """
     Send a conversation summary email to the recipient.
 
@@ -86,6 +265,7 @@ def send_email_summary(recipient: str, summary_context, language: str = None) ->
         summary_context: Context data for generating the summary (can be None)
         language: Language code for the summary (e.g., "en", "de", "tr").
                   If None, uses the current language from language_manager.
+        smtp: Open SMTPSession to send on. If None, a one-off connection is used.
     """
     # Get the current language if not specified
     if language is None:
@@ -101,18 +281,9 @@ def send_email_summary(recipient: str, summary_context, language: str = None) ->
     else:
         context_str = str(summary_context)
 
-    summary = None
-    summary_prompt = summary_prompt_template.format(context=context_str)
-    for attempt in range(3):
-        try:
-            summary = llm.invoke(summary_prompt).content.strip()
-            break
-        except Exception as e:
-            logger.warning(f"Summary LLM attempt {attempt + 1}/3 failed: {e}")
-            if attempt < 2:
-                time.sleep(1 * (attempt + 1))
-
-    if summary is None:
+    try:
+        summary = _llm_summary(summary_prompt_template.format(context=context_str))
+    except RuntimeError:
         logger.error("Summary LLM failed after 3 attempts, using raw context")
         summary = context_str[:2000]
 
@@ -125,7 +296,17 @@ def send_email_summary(recipient: str, summary_context, language: str = None) ->
     em['to'] = recipient
     em.set_content(body)
 
-    return _send_via_smtp(em, recipient)
+    return _send_via_smtp(em, recipient, smtp)
+
+
+def format_lead_products(products) -> str:
+    """Products block of the lead notification email, with fallbacks for missing fields."""
+    if products:
+        return '\n'.join(
+            f"  - {product.get('name', product.get('product_name', 'N/A'))}"
+            for product in products
+        )
+    return EMAIL_TEMPLATES.get("no_products_selected", "No products selected")
 
 
 def send_lead_notification(
@@ -140,23 +321,23 @@ def send_lead_notification(
     next_step: str,
     lead_degree: float,
     confidence: int,
-    products: list
+    products: list,
+    smtp: SMTPSession | None = None,
+    products_list: str | None = None,
 ) -> bool:
-    """Send lead notification to company when appointment is confirmed."""
+    """Send lead notification to company when appointment is confirmed.
+
+    products_list: output of format_lead_products(products), when the caller
+    sends the same lead to several recipients and renders it once.
+    """
 
     # Map internal keys to display labels from config
     timing_labels = SERVICES["purchase_timing"]
     step_labels = SERVICES["service_options"]
     reach_labels = SERVICES["reachability"]
 
-    # Build products list with fallbacks
-    if products:
-        products_list = '\n'.join(
-            f"  - {product.get('name', product.get('product_name', 'N/A'))}"
-            for product in products
-        )
-    else:
-        products_list = EMAIL_TEMPLATES.get("no_products_selected", "No products selected")
+    if products_list is None:
+        products_list = format_lead_products(products)
 
     subject = EMAIL_TEMPLATES["lead_subject"].format(
         name=customer_name,
@@ -182,4 +363,4 @@ def send_lead_notification(
     em['to'] = company_email
     em.set_content(body)
 
-    return _send_via_smtp(em, company_email)
+    return _send_via_smtp(em, company_email, smtp)
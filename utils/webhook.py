@@ -5,6 +5,7 @@ Sends conversation transcripts, contact info, and metadata to the
 logging endpoint for analytics and lead tracking.
 """
 
+import importlib.util
 import logging
 from datetime import datetime
 from typing import List, Optional
@@ -17,12 +18,59 @@ from config.settings import (
     WEBHOOK_API_KEY,
     WEBHOOK_TIMEOUT,
     WEBHOOK_RETRIES,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_KEEPALIVE_EXPIRY,
 )
 from core.session_state import UserData
 from utils.history import normalize_messages
+from utils import fastjson
 
 logger = logging.getLogger(__name__)
 
+# Shared client so repeated webhooks reuse pooled keep-alive connections
+# instead of paying a fresh TCP+TLS handshake on every session close.
+# HTTP/2 (needs the h2 package, httpx[http2]) lets concurrent webhooks share
+# one connection; without h2 the client stays on pooled HTTP/1.1.
+_client: Optional[httpx.AsyncClient] = None
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared webhook client, creating it on first use (or after close)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=httpx.Timeout(WEBHOOK_TIMEOUT),
+            limits=httpx.Limits(
+                max_keepalive_connections=WEBHOOK_MAX_CONNECTIONS,
+                max_connections=WEBHOOK_MAX_CONNECTIONS,
+                keepalive_expiry=WEBHOOK_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _client
+
+
+def new_session_id() -> str:
+    """Webhook session id for the current time, e.g. "session_20260216_143005".
+
+    Formatted by hand — same output as strftime('%Y%m%d_%H%M%S'), without the
+    strftime format parsing.
+    """
+    now = datetime.now()
+    return (
+        f"session_{now.year:04d}{now.month:02d}{now.day:02d}"
+        f"_{now.hour:02d}{now.minute:02d}{now.second:02d}"
+    )
+
+
+async def close_webhook_client() -> None:
+    """Close the shared webhook client. Safe to call when it was never opened."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
 
 def _build_brief(userdata: UserData) -> Optional[str]:
     """Return the agent-written conversation summary, if available."""
@@ -112,24 +160,26 @@ async def send_session_webhook(
         "sessions": [session_data],
     }
 
+    # Serialize once (orjson) — retries resend the same bytes
+    body = fastjson.dumps_bytes(payload)
+
     # Send with retry logic
     for attempt in range(WEBHOOK_RETRIES):
         try:
-            async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT) as client:
-                response = await client.post(
-                    WEBHOOK_URL,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
+            response = await _get_client().post(
+                WEBHOOK_URL,
+                content=body,
+                headers={"Content-Type": "application/json"},
+            )
+
+            if response.status_code in (200, 201):
+                logger.info(f"Webhook sent successfully (session: {session_id})")
+                return True
+            else:
+                logger.warning(
+                    f"Webhook returned status {response.status_code}: {response.text[:200]}"
                 )
 
-                if response.status_code in (200, 201):
-                    logger.info(f"Webhook sent successfully (session: {session_id})")
-                    return True
-                else:
-                    logger.warning(
-                        f"Webhook returned status {response.status_code}: {response.text[:200]}"
-                    )
-
         except httpx.TimeoutException:
             logger.warning(f"Webhook timeout (attempt {attempt + 1}/{WEBHOOK_RETRIES})")
         except httpx.RequestError as e: